@@ -0,0 +1,217 @@
+"""
+Candidate store — structured record of every venue discovery has surfaced.
+
+One JSON object per line in events/candidates.jsonl:
+    {"key": ..., "name": ..., "city": ..., "url": ..., "query": ..., "description": ...,
+     "discovered": "YYYY-MM-DD", "status": "pending" | "rejected" | "accepted",
+     "domain": "registered.domain", "score": 3}
+
+Records are indexed by normalized name (and registered domain), so membership
+checks are O(1).
+candidates.md stays the human review surface: Jake's decisions are read back
+from it once per run (sync_from_markdown) and it is re-rendered once at the end
+(render_markdown) instead of being rewritten per candidate.
+"""
+
+import json
+import re
+import unicodedata
+from datetime import date
+from pathlib import Path
+
+WORKSPACE       = Path(__file__).parent.parent
+STORE_FILE      = WORKSPACE / "events/candidates.jsonl"
+CANDIDATES_FILE = WORKSPACE / "events/candidates.md"
+
+PENDING  = "pending"
+REJECTED = "rejected"
+ACCEPTED = "accepted"
+
+MD_HEADER = [
+    "# Venue Candidates",
+    "_Awaiting Jake's review. Say \"approve [venue]\" or \"reject [venue]\"._",
+]
+MD_PENDING_EMPTY = "_(none yet — discovery runs nightly)_"
+MD_REJECTED_NOTE = "_(venues flagged here are never re-surfaced)_"
+
+_HEADING_RE = re.compile(r'^### (.+) \(([^()]+)\)(?:\s+—\s+discovered\s+(\S+))?\s*$')
+_FIELD_RE   = re.compile(r'^- \*\*(.+?):\*\*\s*(.*)$')
+
+
+def normalize_key(name):
+    """Normalize a venue name for membership checks ("The Chapel" == "chapel")."""
+    name = unicodedata.normalize("NFKD", name.lower().strip())
+    name = name.encode("ascii", "ignore").decode()
+    name = re.sub(r'^the\s+', '', name)
+    name = re.sub(r'[^\w\s]', '', name)
+    return re.sub(r'\s+', ' ', name).strip()
+
+
+def _parse_markdown(text):
+    """candidates.md → {"pending": [record, ...], "rejected": [record, ...]}"""
+    sections = {PENDING: [], REJECTED: []}
+    section = None
+    current = None
+    for line in text.splitlines():
+        if line.startswith("## "):
+            title = line[3:].strip().lower()
+            section = PENDING if title.startswith("pending") else REJECTED if title.startswith("rejected") else None
+            current = None
+        elif line.startswith("### ") and section:
+            m = _HEADING_RE.match(line)
+            if m:
+                name, city, discovered = m.group(1).strip(), m.group(2).strip(), m.group(3)
+            else:
+                name, city, discovered = line[4:].split("(")[0].strip(), "", None
+            current = {"name": name, "city": city, "discovered": discovered,
+                       "url": "", "query": "", "description": ""}
+            sections[section].append(current)
+        elif current is not None:
+            m = _FIELD_RE.match(line)
+            if not m:
+                continue
+            field, value = m.group(1).lower(), m.group(2).strip()
+            if field == "events page":
+                current["url"] = value
+            elif field == "why flagged":
+                q = re.search(r'"(.+)"', value)
+                current["query"] = q.group(1) if q else value
+            elif field == "context":
+                current["description"] = value
+    return sections
+
+
+class CandidateStore:
+    """In-memory index over candidates.jsonl, keyed by normalize_key(name)."""
+
+    def __init__(self, path=STORE_FILE):
+        self.path = Path(path)
+        self.records = {}
+        self.domains = {}    # registered domain → key
+
+    @classmethod
+    def load(cls, path=STORE_FILE):
+        store = cls(path)
+        if store.path.exists():
+            for line in store.path.read_text().splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                store.records[rec["key"]] = rec
+                if rec.get("domain"):
+                    store.domains[rec["domain"]] = rec["key"]
+        return store
+
+    def __contains__(self, name):
+        return normalize_key(name) in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, name):
+        return self.records.get(normalize_key(name))
+
+    def has_domain(self, domain):
+        return domain in self.domains
+
+    def add(self, name, city, url="", query="", description="", status=PENDING, discovered=None,
+            domain="", score=None):
+        """Add a candidate (no-op if its normalized name is already stored). Returns the record."""
+        key = normalize_key(name)
+        if key in self.records:
+            return self.records[key]
+        rec = {
+            "key": key,
+            "name": name,
+            "city": city,
+            "url": url,
+            "query": query,
+            "description": description[:200],
+            "discovered": discovered or date.today().isoformat(),
+            "status": status,
+            "domain": domain,
+            "score": score,
+        }
+        self.records[key] = rec
+        if domain:
+            self.domains[domain] = key
+        return rec
+
+    def set_status(self, name, status):
+        rec = self.get(name)
+        if rec:
+            rec["status"] = status
+        return rec
+
+    def with_status(self, status):
+        return [r for r in self.records.values() if r["status"] == status]
+
+    def sync_from_markdown(self, md_path=CANDIDATES_FILE, known_keys=()):
+        """
+        Fold review decisions made in candidates.md back into the store:
+        - entries under "## Rejected" become rejected
+        - pending candidates now present in venues.md (known_keys) become accepted
+        - pending candidates removed from "## Pending" without being added are rejected
+        - entries in the markdown but not in the store are imported (first-run migration)
+        """
+        md_path = Path(md_path)
+        if not md_path.exists():
+            return
+        sections = _parse_markdown(md_path.read_text())
+        first_run = not self.records
+
+        listed_pending = set()
+        for status in (PENDING, REJECTED):
+            for entry in sections[status]:
+                key = normalize_key(entry["name"])
+                if status == PENDING:
+                    listed_pending.add(key)
+                rec = self.records.get(key)
+                if rec is None:
+                    self.add(entry["name"], entry["city"], entry["url"], entry["query"],
+                             entry["description"], status=status, discovered=entry["discovered"])
+                elif status == REJECTED:
+                    rec["status"] = REJECTED
+
+        for key, rec in self.records.items():
+            if rec["status"] != PENDING:
+                continue
+            if key in known_keys:
+                rec["status"] = ACCEPTED
+            elif not first_run and key not in listed_pending:
+                rec["status"] = REJECTED
+
+    def save(self):
+        """Rewrite candidates.jsonl atomically."""
+        lines = [json.dumps(r, ensure_ascii=False) for r in self.records.values()]
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text("\n".join(lines) + ("\n" if lines else ""))
+        tmp.replace(self.path)
+
+    def render_markdown(self, md_path=CANDIDATES_FILE):
+        """Write candidates.md (Pending + Rejected) from the store in one pass."""
+        lines = MD_HEADER + ["", "## Pending"]
+        pending = self.with_status(PENDING)
+        if not pending:
+            lines.append(MD_PENDING_EMPTY)
+        for rec in sorted(pending, key=lambda r: r["discovered"], reverse=True):
+            lines += [
+                "",
+                f"### {rec['name']} ({rec['city']}) — discovered {rec['discovered']}",
+                f"- **Events page:** {rec['url']}",
+                f"- **Why flagged:** Found via search: \"{rec['query']}\"",
+                f"- **Context:** {rec['description']}",
+            ]
+            if rec.get("score") is not None:
+                lines.append(f"- **Score:** {rec['score']}")
+
+        lines += ["", "## Rejected", MD_REJECTED_NOTE]
+        for rec in self.with_status(REJECTED):
+            lines += ["", f"### {rec['name']} ({rec['city']})"]
+            if rec["url"]:
+                lines.append(f"- **Events page:** {rec['url']}")
+
+        Path(md_path).write_text("\n".join(lines) + "\n")
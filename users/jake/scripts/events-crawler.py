@@ -22,6 +22,8 @@ from datetime import datetime, date
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+from venue_registry import load_venues, venues_by_city
+
 WORKSPACE = Path(__file__).parent.parent
 VENUES_FILE   = WORKSPACE / "events/venues.md"
 EVENTS_FILE   = WORKSPACE / "events/events.md"
@@ -61,31 +63,8 @@ MAX_GENRES = 3
 # ─── Venue parsing ───────────────────────────────────────────────────────────
 
 def parse_venues():
-    """Parse venues.md → {city: [(name, official_url, songkick_id, neighborhood)]}"""
-    venues = defaultdict(list)
-    current_city = None
-    for line in VENUES_FILE.read_text().splitlines():
-        if line.startswith("## "):
-            current_city = line[3:].strip()
-        elif line.startswith("- **") and " | " in line and current_city:
-            parts = [p.strip() for p in line.split("|")]
-            name_match = re.match(r'- \*\*(.+?)\*\*', parts[0])
-            if not name_match:
-                continue
-            name = name_match.group(1)
-            official_url = parts[1].strip() if len(parts) > 1 else ""
-            songkick_id = None
-            neighborhood = None
-            for part in parts[2:]:
-                part = part.strip()
-                m = re.match(r'songkick:(\d+)', part)
-                if m:
-                    songkick_id = m.group(1)
-                m = re.match(r'hood:(.+)', part)
-                if m:
-                    neighborhood = m.group(1)
-            venues[current_city].append((name, official_url, songkick_id, neighborhood))
-    return venues
+    """Load venues.md via the shared registry → {city: [Venue, ...]}"""
+    return venues_by_city(load_venues(VENUES_FILE))
 
 
 # ─── HTTP fetch ──────────────────────────────────────────────────────────────
@@ -406,33 +385,34 @@ def write_events_md(all_events_by_city):
 
 def main():
     print(f"\n🎵 Event Crawler — {datetime.now(ET).strftime('%Y-%m-%d %H:%M %Z')}")
-    venues_by_city = parse_venues()
-    total = sum(len(v) for v in venues_by_city.values())
-    print(f"Loaded {total} venues across {len(venues_by_city)} cities\n")
+    by_city = parse_venues()
+    total = sum(len(v) for v in by_city.values())
+    print(f"Loaded {total} venues across {len(by_city)} cities\n")
 
     genre_cache = load_genre_cache()
     all_events = defaultdict(list)
     today = date.today()
 
-    for city, venues in venues_by_city.items():
+    for city, venues in by_city.items():
         print(f"📍 {city}")
-        for name, official_url, songkick_id, neighborhood in venues:
-            if songkick_id:
-                crawl_url = f"https://www.songkick.com/venues/{songkick_id}/calendar"
-                print(f"  [Songkick] {name}...")
+        for venue in venues:
+            if venue.songkick_id:
+                crawl_url = f"https://www.songkick.com/venues/{venue.songkick_id}/calendar"
+                print(f"  [Songkick] {venue.name}...")
                 html = fetch(crawl_url)
-                events = parse_songkick(html, name, official_url)
-                is_theater = False
+                events = parse_songkick(html, venue.name, venue.url)
             else:
-                print(f"  [Direct]   {name}...")
-                html = fetch(official_url)
-                events = parse_theater(html, name, official_url)
-                is_theater = True
+                print(f"  [Direct]   {venue.name}...")
+                html = fetch(venue.url)
+                events = parse_theater(html, venue.name, venue.url)
+            # The venues.md section decides, not the crawl path: a music venue
+            # without a Songkick ID is still music
+            is_theater = venue.category.lower() == "theater"
 
             future = [e for e in events if e["date"] >= today]
             # Tag each event with neighborhood + is_theater
             for ev in future:
-                ev["neighborhood"] = neighborhood or ""
+                ev["neighborhood"] = venue.neighborhood or ""
                 ev["is_theater"] = is_theater
             print(f"  → {len(future)} upcoming events")
             all_events[city].extend(future)
@@ -7,19 +7,26 @@ Surfaces candidates to events/candidates.md for Jake's review.
 import json
 import os
 import re
+import threading
+import time
 import urllib.request
 import urllib.parse
-from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+from candidate_store import CandidateStore, normalize_key
 from dotenv_loader import load_dotenv
+from venue_registry import load_venues
+from venue_scoring import MIN_SCORE, cluster_hits, registered_domain, score_clusters
 load_dotenv()
 
 WORKSPACE = Path(__file__).parent.parent
 VENUES_FILE = WORKSPACE / "events/venues.md"
 CANDIDATES_FILE = WORKSPACE / "events/candidates.md"
 STATE_FILE = WORKSPACE / "scripts/discovery-state.json"
+SEARCH_CACHE_FILE = WORKSPACE / "scripts/discovery-search-cache.json"
 ET = ZoneInfo("America/New_York")
 
 # Rotating search queries — advances through list each run
@@ -41,6 +48,11 @@ SEARCHES = [
     ("SF",  "hidden gem music venue Bay Area"),
 ]
 
+SEARCHES_PER_RUN = 3        # how far the rotation advances each night
+SEARCH_WORKERS = 4          # concurrent Brave requests in flight
+BRAVE_MIN_INTERVAL = 1.1    # seconds between request starts (Brave free tier: 1 req/s)
+SEARCH_CACHE_TTL = 7 * 86400  # rotation wraps every 5 nights — reuse results within a week
+
 BRAVE_API_KEY = os.environ.get("BRAVE_API_KEY", "")
 
 
@@ -56,28 +68,45 @@ def save_state(state):
 
 
 def load_known_venues():
-    """Return set of lowercase venue names already in venues.md."""
-    text = VENUES_FILE.read_text().lower()
-    names = re.findall(r'\*\*(.+?)\*\*', text)
-    return set(names)
-
-
-def load_rejected():
-    """Return set of lowercase rejected venue names from candidates.md."""
-    text = CANDIDATES_FILE.read_text()
-    rejected_section = False
-    rejected = set()
-    for line in text.splitlines():
-        if "## Rejected" in line:
-            rejected_section = True
-        elif rejected_section and line.startswith("###"):
-            name = line[4:].split("(")[0].strip().lower()
-            rejected.add(name)
-    return rejected
-
-
-def search_brave(query):
-    """Search using Brave API. Returns list of {title, url, description}."""
+    """Return (normalized names, registered domains) of venues already in venues.md."""
+    venues = load_venues(VENUES_FILE)
+    return ({normalize_key(v.name) for v in venues},
+            {registered_domain(v.url) for v in venues if v.url})
+
+
+class RateLimiter:
+    """Spaces out request starts across threads by at least min_interval seconds."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._next_at > now:
+                time.sleep(self._next_at - now)
+                now = self._next_at
+            self._next_at = now + self.min_interval
+
+
+def load_search_cache():
+    """Return {query: {"fetched_at": ts, "results": [...]}} with expired entries dropped."""
+    try:
+        cache = json.loads(SEARCH_CACHE_FILE.read_text())
+    except Exception:
+        return {}
+    now = time.time()
+    return {q: e for q, e in cache.items() if now - e.get("fetched_at", 0) < SEARCH_CACHE_TTL}
+
+
+def save_search_cache(cache):
+    SEARCH_CACHE_FILE.write_text(json.dumps(cache, indent=2))
+
+
+def search_brave(query, limiter=None):
+    """Search using Brave API. Returns list of {title, url, description}, or None on error."""
     if not BRAVE_API_KEY:
         print(f"  ⚠️  No BRAVE_API_KEY set, skipping search: {query}")
         return []
@@ -86,9 +115,10 @@ def search_brave(query):
     url = f"https://api.search.brave.com/res/v1/web/search?{params}"
     req = urllib.request.Request(url, headers={
         "Accept": "application/json",
-        "Accept-Encoding": "gzip",
         "X-Subscription-Token": BRAVE_API_KEY,
     })
+    if limiter:
+        limiter.wait()
     try:
         with urllib.request.urlopen(req, timeout=10) as resp:
             data = json.loads(resp.read())
@@ -97,7 +127,36 @@ def search_brave(query):
                     for r in results]
     except Exception as e:
         print(f"  ⚠️  Search error: {e}")
-        return []
+        return None
+
+
+def run_searches(queries, cache):
+    """
+    Run queries concurrently under a shared rate limiter, serving fresh results
+    from the on-disk cache. Returns results lists in the same order as queries.
+    Successful live responses are added to cache (caller saves it).
+    """
+    limiter = RateLimiter(BRAVE_MIN_INTERVAL)
+    results = [None] * len(queries)
+    pending = []
+    for i, q in enumerate(queries):
+        if q in cache:
+            results[i] = cache[q]["results"]
+        else:
+            pending.append(i)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as pool:
+            live = pool.map(lambda i: search_brave(queries[i], limiter), pending)
+            for i, res in zip(pending, live):
+                if res is None:
+                    res = []
+                elif BRAVE_API_KEY:
+                    cache[queries[i]] = {"fetched_at": time.time(), "results": res}
+                results[i] = res
+
+    print(f"  Searches: {len(queries)} total, {len(queries) - len(pending)} cached, {len(pending)} live")
+    return results
 
 
 def looks_like_venue(result, city):
@@ -129,80 +188,55 @@ def extract_venue_name(result):
     return title[:60] if title else None
 
 
-def parse_existing_candidates():
-    """Return set of pending candidate names (lowercase)."""
-    text = CANDIDATES_FILE.read_text()
-    pending = set()
-    in_pending = False
-    for line in text.splitlines():
-        if "## Pending" in line:
-            in_pending = True
-        elif line.startswith("## "):
-            in_pending = False
-        elif in_pending and line.startswith("### "):
-            name = line[4:].split("(")[0].strip().lower()
-            pending.add(name)
-    return pending
-
-
-def append_candidate(name, city, url, query, description):
-    """Add a new candidate to candidates.md."""
-    today_str = date.today().strftime("%Y-%m-%d")
-    text = CANDIDATES_FILE.read_text()
-
-    entry = (
-        f"\n### {name} ({city}) — discovered {today_str}\n"
-        f"- **Events page:** {url}\n"
-        f"- **Why flagged:** Found via search: \"{query}\"\n"
-        f"- **Context:** {description[:200]}\n"
-    )
-
-    # Insert after "## Pending" line
-    text = text.replace(
-        "_(none yet — discovery runs nightly)_",
-        entry.strip()
-    )
-    if entry.strip() not in text:
-        text = re.sub(r'(## Pending\n)', r'\1' + entry, text)
-
-    CANDIDATES_FILE.write_text(text)
-
-
 def main():
     print(f"\n🔍 Event Discovery — {datetime.now(ET).strftime('%Y-%m-%d %H:%M %Z')}")
 
     state = load_state()
-    known = load_known_venues()
-    rejected = load_rejected()
-    existing_candidates = parse_existing_candidates()
-    already_known = known | rejected | existing_candidates
+    known, known_domains = load_known_venues()
+    store = CandidateStore.load()
+    store.sync_from_markdown(CANDIDATES_FILE, known)
 
-    # Run 3 searches from the rotating list
+    # Run the next SEARCHES_PER_RUN searches from the rotating list
     idx = state.get("search_index", 0)
     searches_this_run = []
-    for i in range(3):
+    for i in range(min(SEARCHES_PER_RUN, len(SEARCHES))):
         searches_this_run.append(SEARCHES[(idx + i) % len(SEARCHES)])
-    state["search_index"] = (idx + 3) % len(SEARCHES)
+    state["search_index"] = (idx + SEARCHES_PER_RUN) % len(SEARCHES)
 
-    new_candidates = []
+    search_cache = load_search_cache()
+    all_results = run_searches([q for _, q in searches_this_run], search_cache)
+    save_search_cache(search_cache)
 
-    for city, query in searches_this_run:
+    hits = []
+    for (city, query), results in zip(searches_this_run, all_results):
         print(f"\n  🔎 [{city}] {query}")
-        results = search_brave(query)
         print(f"     {len(results)} results")
+        hits.extend((city, query, r) for r in results if looks_like_venue(r, city))
 
-        for r in results:
-            if not looks_like_venue(r, city):
-                continue
-            name = extract_venue_name(r)
-            if not name or name.lower() in already_known:
-                continue
-
-            print(f"     ✨ New candidate: {name}")
-            append_candidate(name, city, r["url"], query, r["description"])
-            new_candidates.append(name)
-            already_known.add(name.lower())
+    # Cluster title variants by site, drop anything already known, then score the rest
+    clusters = [
+        c for c in cluster_hits(hits, extract_venue_name)
+        if c.domain not in known_domains and not store.has_domain(c.domain)
+        and not any(normalize_key(n) in known or n in store for n in c.names)
+    ]
+    print(f"\n  🧮 Scoring {len(clusters)} cluster(s) from {len(hits)} venue-like result(s)")
+    score_clusters(clusters)
 
+    new_candidates = []
+    for c in clusters:
+        name = c.name
+        if c.score < MIN_SCORE:
+            print(f"     ✗ {name} [{c.domain}] score {c.score}: {', '.join(c.reasons)}")
+            continue
+        if normalize_key(name) in known or name in store:
+            continue
+
+        print(f"     ✨ New candidate: {name} [{c.domain}] score {c.score}: {', '.join(c.reasons)}")
+        store.add(name, c.city, c.url, c.query, c.description, domain=c.domain, score=c.score)
+        new_candidates.append(name)
+
+    store.save()
+    store.render_markdown(CANDIDATES_FILE)
     save_state(state)
 
     print(f"\n✅ Discovery done — {len(new_candidates)} new candidate(s) found")
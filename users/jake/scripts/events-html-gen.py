@@ -11,6 +11,8 @@ from datetime import datetime, date
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+from venue_registry import load_venues
+
 WORKSPACE     = Path(__file__).parent.parent          # users/jake/
 REPO_ROOT     = Path(__file__).parent.parent.parent.parent  # repo root
 ENRICHED_FILE = WORKSPACE / "events/events-enriched.json"
@@ -328,17 +330,11 @@ def load_events_md_fallback():
 
 
 def load_venues_md():
-    """Parse venues.md → {city: [name, ...]}"""
-    text = VENUES_FILE.read_text()
+    """Load venues.md via the shared registry → {city: [name, ...]}"""
     venues = {"New York City": [], "San Francisco": []}
-    current_city = None
-    for line in text.splitlines():
-        if line.startswith("## "):
-            current_city = line[3:].strip()
-        elif line.startswith("- **") and current_city in venues:
-            m = re.match(r'- \*\*(.+?)\*\*', line)
-            if m:
-                venues[current_city].append(m.group(1))
+    for v in load_venues(VENUES_FILE):
+        if v.city in venues:
+            venues[v.city].append(v.name)
     return venues
 
 
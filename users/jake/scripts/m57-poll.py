@@ -1,103 +1,270 @@
 #!/usr/bin/env python3
 """
-M57 Bus Poller — runs every minute, records current bus positions to file.
+M57 Bus Poller — records current bus positions to m57-status.json.
 Always runs (no time window check) so "where's my bus" works any time.
+
+Watches every subscription in m57-subscriptions.json (see m57_subscriptions;
+without the file, just the M57 commute from m57_config). Each tick makes one
+SIRI call per distinct stop — or one VehicleMonitoring call for a line watched
+at several stops — and fans the result out to every matching subscription.
+Non-primary subscriptions get their own m57-status-<name>.json.
+
+Modes:
+  python3 m57-poll.py            # poll once and exit
+  python3 m57-poll.py --daemon   # stay resident: one keep-alive HTTPS connection,
+                                 # adaptive polling cadence (see next_interval),
+                                 # alert check run in-process on every fresh poll
+                                 # (or on the static schedule when SIRI fails)
+
+Recorded SIRI responses are replayed through the same parse + alert logic by
+m57-replay.py.
+
+Daemon signals:
+  SIGTERM / SIGINT  finish the current poll and exit
+  SIGHUP            drop the HTTPS connection, reload subscriptions and poll again immediately
 """
 
-import json
-import urllib.request
-from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
-from pathlib import Path
+import argparse
+import signal
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 
-STOP_ID = "MTA_405565"       # West End Av / W 61 St (eastbound M57)
-LINE_REF = "MTA NYCT_M57"
-STATUS_FILE = Path(__file__).parent / "m57-status.json"
-ET = ZoneInfo("America/New_York")
+from dotenv_loader import load_dotenv
+import m57_history
+from m57_alerting import notifier, process_status
+from m57_state import read_json, write_json
+from m57_config import ET
+from m57_schedule import scheduled_buses
+from m57_siri import SiriClient, buses_for, fetch_watches, parse_arrivals
+from m57_subscriptions import PRIMARY_STATUS_FILE, load_subscriptions, plan_fetches
+from m57_trajectory import TrajectoryTracker
+load_dotenv()
 
+STATUS_FILE = PRIMARY_STATUS_FILE
+
+# Daemon cadence (seconds between polls)
+FAST_INTERVAL   = 15     # alert window, or a bus closing in on the alert band
+NORMAL_INTERVAL = 60
+NIGHT_INTERVAL  = 300    # NIGHT_HOURS, when nobody is waiting for a bus
+NIGHT_HOURS     = (1, 5)  # [start, end) hour ET
+APPROACH_MARGIN = 5      # fast-poll when an in-service bus is within its subscription's alert_max + this many minutes
+DAILY_REQUEST_BUDGET = 4000  # SIRI requests per ET day (60s all day would be 1440)
+
+eta_corrector = m57_history.ETACorrector()
+trajectories = {}   # subscription name → TrajectoryTracker (in-memory, daemon lifetime)
+
+
+def get_arrivals(client=None, sub=None):
+    client = client or SiriClient()
+    sub = sub or load_subscriptions()[0]
+    data = client.stop_monitoring(sub.stop_id, sub.line_ref)
+    return parse_arrivals(data, datetime.now(timezone.utc), sub.line_ref)
 
-def get_arrivals():
-    import urllib.parse
-    url = (
-        f"https://bustime.mta.info/api/siri/stop-monitoring.json"
-        f"?key=TEST&MonitoringRef={STOP_ID}&LineRef={urllib.parse.quote(LINE_REF)}"
-    )
-    req = urllib.request.Request(url, headers={"User-Agent": "M57Monitor/1.0"})
-    with urllib.request.urlopen(req, timeout=10) as resp:
-        data = json.loads(resp.read())
-
-    visits = (
-        data.get("Siri", {})
-        .get("ServiceDelivery", {})
-        .get("StopMonitoringDelivery", [{}])[0]
-        .get("MonitoredStopVisit", [])
-    )
 
+def poll_once(client, subs=None, extra=None):
+    """
+    One poll tick for every subscription: fetch arrivals with the fewest SIRI
+    calls, write each subscription's status file (extra keys go into the
+    primary's), and return [(subscription, status), ...].
+    """
+    subs = subs or load_subscriptions()
+    now_et = datetime.now(ET)
     now_utc = datetime.now(timezone.utc)
-    buses = []
 
-    for visit in visits:
-        journey = visit.get("MonitoredVehicleJourney", {})
-        call = journey.get("MonitoredCall", {})
+    results, errors, response_at = fetch_watches(client, plan_fetches(subs), datetime.now(timezone.utc))
+    for what, err in errors.items():
+        print(f"[{now_et.strftime('%H:%M %Z')}] ERROR ({what[0]} {what[1]}): {err}")
 
-        expected_str = call.get("ExpectedArrivalTime") or call.get("AimedArrivalTime")
-        if not expected_str:
-            continue
+    polled = []
+    for sub in subs:
+        buses = buses_for(sub, results)
+        if buses is None:
+            # Preserve last known good data, just add error flag — plus the
+            # static schedule (if an index was built) for the alerter to fall back on
+            existing = read_json(sub.status_file, {})
+            status = {**existing, "error": "; ".join(errors.values()) or "no data", "error_at": now_utc.isoformat(),
+                      "schedule_fallback": scheduled_buses(sub, now_et)}
+        else:
+            if sub.primary:
+                record_history(now_utc, buses)
+                eta_corrector.apply(buses, now_et)
+            trajectories.setdefault(sub.name, TrajectoryTracker()).apply(buses, now_utc.timestamp())
+            status = {
+                "polled_at": now_utc.isoformat(),
+                "polled_at_et": now_et.strftime("%Y-%m-%d %H:%M:%S %Z"),
+                "stop": sub.stop_name,
+                "stop_id": sub.stop_id,
+                "line": sub.line_ref,
+                "buses": buses,
+                "error": None,
+                "response_at": response_at.isoformat() if response_at else None,
+            }
+            label = "" if sub.primary else f" {sub.name}:"
+            print(f"[{now_et.strftime('%H:%M %Z')}]{label} {len(buses)} bus(es) found")
+            for b in buses[:3]:
+                svc = "✅" if b["in_service"] else "🔜"
+                traj = f" | track {b['eta_low']:.1f}–{b['eta_high']:.1f} min" if "eta_low" in b else ""
+                print(f"  {svc} {b['minutes_away']:.1f} min | {b['distance_readable']} | {b['stops_away']} stops{traj}")
+
+        if sub.primary:
+            status.update(extra or {})
+        write_json(sub.status_file, status)
+        polled.append((sub, status))
+    return polled
+
+
+def record_history(now_utc, buses):
+    """Append this poll to the history store; never let it break polling."""
+    try:
+        m57_history.append(now_utc, buses)
+    except OSError as e:
+        print(f"  ⚠️  history append failed: {e}")
+
+
+def _window_seconds_left(now_et, subs):
+    """Seconds of today's alert windows still ahead of now_et (identical windows counted once)."""
+    windows = {(s.window_start, s.window_end, s.window_days): s for s in subs}
+    return sum(s.window_seconds_left(now_et) for s in windows.values())
+
+
+def next_interval(now_et, polled, requests_today, per_tick=1):
+    """
+    Seconds until the next poll.
 
-        try:
-            expected = datetime.fromisoformat(expected_str)
-        except ValueError:
+    polled: [(subscription, status), ...] from the last tick; per_tick: SIRI
+    requests one tick costs.
+
+    Desired cadence: FAST inside any subscription's alert window or when an
+    in-service bus is within that subscription's alert_max + APPROACH_MARGIN
+    minutes, NIGHT overnight, NORMAL otherwise. It is then stretched so the
+    day's remaining DAILY_REQUEST_BUDGET lasts until midnight, with the rest of
+    today's alert windows reserved at FAST cadence first.
+    """
+    subs = [sub for sub, _ in polled]
+    approaching = any(
+        b.get("in_service") and b.get("minutes_away", 99) <= sub.alert_max + APPROACH_MARGIN
+        for sub, status in polled for b in status.get("buses", [])
+    )
+    windowed = any(sub.in_window(now_et) for sub in subs)
+    if windowed or approaching:
+        desired = FAST_INTERVAL
+    elif NIGHT_HOURS[0] <= now_et.hour < NIGHT_HOURS[1]:
+        desired = NIGHT_INTERVAL
+    else:
+        desired = NORMAL_INTERVAL
+
+    left = (DAILY_REQUEST_BUDGET - requests_today) / max(1, per_tick)   # ticks left today
+    if left <= 0:
+        return NIGHT_INTERVAL
+
+    midnight = (now_et + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    day_left = (midnight - now_et).total_seconds()
+    window_left = _window_seconds_left(now_et, subs)
+
+    if windowed:
+        floor = window_left / left
+    else:
+        spendable = left - window_left / FAST_INTERVAL
+        if spendable <= 0:
+            return NIGHT_INTERVAL
+        floor = (day_left - window_left) / spendable
+    return min(NIGHT_INTERVAL, max(desired, floor))
+
+
+def on_fresh_poll(sub, status, now_et=None):
+    """In-process alert check, logging how old the API data was when alerts went out."""
+    sent = process_status(status, now_et=now_et, sub=sub)
+    if sent and not status.get("error") and status.get("response_at"):
+        age = (datetime.now(timezone.utc) - datetime.fromisoformat(status["response_at"])).total_seconds()
+        print(f"  ⏱  {len(sent)} alert(s) sent {age:.1f}s after API response")
+
+
+def check_alerts(polled, now_et):
+    """
+    Alert checks for one daemon tick: every in-window subscription with a fresh
+    poll, or — when its SIRI fetch failed — with a static-schedule fallback to alert on.
+    """
+    for sub, status in polled:
+        if not sub.in_window(now_et):
             continue
+        if not status.get("error") or status.get("schedule_fallback"):
+            on_fresh_poll(sub, status, now_et)
+
 
-        minutes_away = (expected.astimezone(timezone.utc) - now_utc).total_seconds() / 60
+def run_daemon():
+    """Poll on an adaptive schedule until SIGTERM/SIGINT."""
+    sys.stdout.reconfigure(line_buffering=True)
+    client = SiriClient()
+    stop = threading.Event()
+    wake = threading.Event()
+    reload = threading.Event()
 
-        distances = call.get("Extensions", {}).get("Distances", {})
-        progress_status = journey.get("ProgressStatus", "")
-        in_service = not ("prevTrip" in progress_status and "layover" in progress_status)
+    def on_stop(signum, frame):
+        print(f"Received {signal.Signals(signum).name}, shutting down after this cycle")
+        stop.set()
+        wake.set()
 
-        buses.append({
-            "vehicle": journey.get("VehicleRef", "unknown"),
-            "minutes_away": round(minutes_away, 1),
-            "stops_away": distances.get("StopsFromCall", "?"),
-            "distance_readable": distances.get("PresentableDistance", "?"),
-            "expected_arrival": expected_str,
-            "in_service": in_service,
-            "progress_status": progress_status,
-        })
+    def on_hup(signum, frame):
+        # Only flag it: the main thread may be mid-request on the connection
+        print("Received SIGHUP, reconnecting and reloading subscriptions")
+        reload.set()
+        wake.set()
 
-    # Sort by arrival time
-    buses.sort(key=lambda b: b["minutes_away"])
-    return buses
+    signal.signal(signal.SIGTERM, on_stop)
+    signal.signal(signal.SIGINT, on_stop)
+    signal.signal(signal.SIGHUP, on_hup)
+
+    subs = load_subscriptions()
+    plan = plan_fetches(subs)
+
+    # Resume today's request count if the daemon was restarted
+    previous = read_json(STATUS_FILE, {})
+    budget_day = datetime.now(ET).date().isoformat()
+    requests_today = previous.get("requests_today", 0) if previous.get("requests_date") == budget_day else 0
+
+    m57_history.compact()
+    print(f"M57 poller daemon started: {len(subs)} subscription(s), {len(plan)} SIRI request(s) per poll "
+          f"({requests_today}/{DAILY_REQUEST_BUDGET} requests used today)")
+    while not stop.is_set():
+        if reload.is_set():
+            reload.clear()
+            client.close()   # between polls, so no request is in flight
+            subs = load_subscriptions()
+            plan = plan_fetches(subs)
+            print(f"  {len(subs)} subscription(s), {len(plan)} SIRI request(s) per poll")
+
+        today = datetime.now(ET).date().isoformat()
+        if today != budget_day:
+            budget_day, requests_today = today, 0
+            m57_history.compact()
+
+        started = time.monotonic()
+        requests_today += len(plan)
+        polled = poll_once(client, subs, extra={"requests_date": budget_day, "requests_today": requests_today})
+        check_alerts(polled, datetime.now(ET))
+
+        interval = next_interval(datetime.now(ET), polled, requests_today, per_tick=len(plan))
+        wake.wait(max(0.0, interval - (time.monotonic() - started)))
+        wake.clear()
+
+    client.close()
+    notifier.flush()
+    print("M57 poller daemon stopped")
 
 
 def main():
-    now_et = datetime.now(ET)
-    now_utc = datetime.now(timezone.utc)
+    parser = argparse.ArgumentParser(description="Poll M57 arrivals into m57-status.json")
+    parser.add_argument("--daemon", action="store_true", help="Run continuously with a persistent connection")
+    args = parser.parse_args()
 
-    try:
-        buses = get_arrivals()
-        status = {
-            "polled_at": now_utc.isoformat(),
-            "polled_at_et": now_et.strftime("%Y-%m-%d %H:%M:%S %Z"),
-            "stop": "West End Av / W 61 St (eastbound M57)",
-            "stop_id": STOP_ID,
-            "buses": buses,
-            "error": None,
-        }
-        print(f"[{now_et.strftime('%H:%M %Z')}] {len(buses)} bus(es) found")
-        for b in buses[:3]:
-            svc = "✅" if b["in_service"] else "🔜"
-            print(f"  {svc} {b['minutes_away']:.1f} min | {b['distance_readable']} | {b['stops_away']} stops")
-    except Exception as e:
-        print(f"[{now_et.strftime('%H:%M %Z')}] ERROR: {e}")
-        # Preserve last known good data, just add error flag
-        try:
-            existing = json.loads(STATUS_FILE.read_text())
-        except Exception:
-            existing = {}
-        status = {**existing, "error": str(e), "error_at": now_utc.isoformat()}
-
-    STATUS_FILE.write_text(json.dumps(status, indent=2))
+    if args.daemon:
+        run_daemon()
+    else:
+        client = SiriClient()
+        poll_once(client)
+        client.close()
 
 
 if __name__ == "__main__":
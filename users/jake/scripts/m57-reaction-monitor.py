@@ -4,26 +4,41 @@ M57 Reaction Monitor — monitors Telegram reactions to bus alerts via OpenClaw.
 When a 👍 reaction is detected on a bus alert message, mutes alerts until midnight.
 
 Uses OpenClaw's message API (no token replication — reuses existing OpenClaw config).
+OpenClaw is only reachable through its Node.js CLI, so each check is a process
+spawn; checks only happen while some target's last alert (sent today) is
+unacknowledged and that target isn't muted. Each subscriber's alert is watched
+separately, and a 👍 mutes only the subscriber who reacted. Run with --daemon to
+stay resident and poll only then.
 
 Can also be called manually:
+  python3 m57-reaction-monitor.py --check               # one check per pending alert (no-op without one)
+  python3 m57-reaction-monitor.py --daemon              # resident watcher
   python3 m57-reaction-monitor.py --mute-until 23:59   # mute until 11:59pm ET today
   python3 m57-reaction-monitor.py --unmute              # unmute immediately
 """
 
 import json
 import os
+import signal
 import sys
 import subprocess
 import argparse
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+from m57_alerting import LAST_MESSAGE_FILE, is_muted, read_last_alerts
+from m57_state import locked, read_json, remove, write_json
+
 MUTE_FILE = Path(__file__).parent / "m57-mute.json"
-LAST_MESSAGE_FILE = Path(__file__).parent / "m57-last-alert.json"
 ET = ZoneInfo("America/New_York")
 
 TELEGRAM_TARGET = os.environ.get("TELEGRAM_TARGET", "455383146")
+OPENCLAW = "/home/exedev/.npm-global/bin/openclaw"
+
+CHECK_INTERVAL = 30   # seconds between reaction checks while an alert is pending
+IDLE_INTERVAL  = 10   # seconds between (local, stat-only) looks for a new alert
 
 
 def get_midnight_et():
@@ -33,44 +48,85 @@ def get_midnight_et():
     return midnight.isoformat()
 
 
-def mute_until(until_time):
-    """Mute alerts until a specific ISO timestamp."""
-    mute_data = {"muted_until": until_time}
-    MUTE_FILE.write_text(json.dumps(mute_data, indent=2))
-    print(f"✅ Alerts muted until {until_time}")
+def mute_until(until_time, target=None):
+    """Mute alerts until a specific ISO timestamp — for everyone, or just one Telegram target."""
+    with locked(MUTE_FILE):
+        mute_data = read_json(MUTE_FILE, {})
+        if target:
+            mute_data.setdefault("targets", {})[target] = until_time
+        else:
+            mute_data["muted_until"] = until_time
+        write_json(MUTE_FILE, mute_data)
+    print(f"✅ Alerts muted until {until_time}" + (f" for {target}" if target else ""))
 
 
 def unmute():
     """Unmute alerts immediately."""
-    if MUTE_FILE.exists():
-        MUTE_FILE.unlink()
+    with locked(MUTE_FILE):
+        remove(MUTE_FILE)
     print("✅ Alerts unmuted")
 
 
-def check_reactions():
+def _pending(last_msg, now_et):
+    """True if the alert was sent today (ET), isn't acknowledged and its target isn't muted."""
+    if not last_msg.get("message_id") or last_msg.get("acknowledged_at"):
+        return False
+    try:
+        sent_at = datetime.fromisoformat(last_msg["sent_at"]).astimezone(ET)
+    except (KeyError, TypeError, ValueError):
+        return False
+    if sent_at.date() != now_et.date():
+        return False
+    return not is_muted(now_et.astimezone(timezone.utc), last_msg.get("target") or TELEGRAM_TARGET)
+
+
+def pending_alerts(now_et=None):
     """
-    Check for 👍 reactions on the last bus alert message via OpenClaw's reactions API.
+    Each target's last alert that still needs watching (see _pending), oldest
+    first — only local file reads, so checking this is essentially free.
     """
-    if not LAST_MESSAGE_FILE.exists():
-        print("ℹ️  No recent alert message on file")
-        return
-    
-    try:
-        last_msg = json.loads(LAST_MESSAGE_FILE.read_text())
-        msg_id = last_msg.get("message_id")
-        if not msg_id:
-            print("ℹ️  No message ID found")
-            return
-    except Exception as e:
-        print(f"⚠️  Could not read last message file: {e}")
-        return
+    now_et = now_et or datetime.now(ET)
+    alerts = [a for a in read_last_alerts().values() if _pending(a, now_et)]
+    return sorted(alerts, key=lambda a: a["sent_at"])
+
+
+def acknowledge(last_msg, mute_target):
+    """Mute the alert's target until midnight and mark the alert as handled."""
+    mute_until(get_midnight_et(), mute_target)
+    # The poller may have recorded a newer alert for this target since last_msg was read; leave that one pending
+    key = last_msg.get("target") or ""
+    with locked(LAST_MESSAGE_FILE):
+        alerts = read_last_alerts()
+        current = alerts.get(key)
+        if current and current.get("message_id") == last_msg["message_id"]:
+            current["acknowledged_at"] = datetime.now(ET).isoformat()
+            write_json(LAST_MESSAGE_FILE, {"targets": alerts}, indent=None)
+
+
+def check_all():
+    """Check every pending alert once; skips OpenClaw entirely when none is pending."""
+    pending = pending_alerts()
+    if not pending:
+        print("ℹ️  No unacknowledged alert today")
+    for last_msg in pending:
+        check_reactions(last_msg)
+
+
+def check_reactions(last_msg):
+    """
+    Check for 👍 reactions on one target's last bus alert via OpenClaw's reactions API.
+    Returns True once the alert has been acknowledged.
+    """
+    msg_id = last_msg["message_id"]
+    # A 👍 only mutes the subscriber it came from; --mute-until mutes everyone
+    mute_target = target = last_msg.get("target") or TELEGRAM_TARGET
     
     try:
         result = subprocess.run(
             [
-                "/home/exedev/.npm-global/bin/openclaw", "message", "reactions",
+                OPENCLAW, "message", "reactions",
                 "--channel", "telegram",
-                "--target", TELEGRAM_TARGET,
+                "--target", target,
                 "--message-id", str(msg_id),
                 "--json",
             ],
@@ -79,28 +135,22 @@ def check_reactions():
         
         if result.returncode != 0:
             print(f"⚠️  Error querying reactions: {result.stderr[:150]}")
-            return
+            return False
         
         try:
             response = json.loads(result.stdout)
             reactions = response.get("reactions", [])
             
-            # Look for 👍 emoji
-            thumbs_up = next((r for r in reactions if r.get("emoji") == "👍"), None)
-            if thumbs_up:
-                print(f"👍 Thumbs up reaction detected!")
-                mute_until(get_midnight_et())
-                return
-            
-            # Also check by emoji name
-            thumbs_up_named = next(
-                (r for r in reactions if "thumbs" in r.get("emoji_name", "").lower()),
+            # Look for 👍 emoji, or by emoji name
+            thumbs_up = next(
+                (r for r in reactions
+                 if r.get("emoji") == "👍" or "thumbs" in r.get("emoji_name", "").lower()),
                 None
             )
-            if thumbs_up_named:
+            if thumbs_up:
                 print(f"👍 Thumbs up reaction detected!")
-                mute_until(get_midnight_et())
-                return
+                acknowledge(last_msg, mute_target)
+                return True
             
             print(f"ℹ️  {len(reactions)} reaction(s) found, but no 👍")
         
@@ -109,6 +159,42 @@ def check_reactions():
     
     except Exception as e:
         print(f"⚠️  Error checking reactions: {e}")
+    return False
+
+
+def run_daemon():
+    """
+    Stay resident: stat the last-alert file every IDLE_INTERVAL and only call
+    OpenClaw (every CHECK_INTERVAL, once per pending alert) while an
+    unacknowledged alert exists.
+    """
+    sys.stdout.reconfigure(line_buffering=True)
+    stop = threading.Event()
+
+    def on_stop(signum, frame):
+        print(f"Received {signal.Signals(signum).name}, shutting down")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, on_stop)
+    signal.signal(signal.SIGINT, on_stop)
+
+    print("M57 reaction monitor daemon started")
+    watching = set()
+    while not stop.is_set():
+        pending = pending_alerts()
+        if not pending:
+            watching.clear()
+            stop.wait(IDLE_INTERVAL)
+            continue
+        for last_msg in pending:
+            if last_msg["message_id"] not in watching:
+                print(f"[{datetime.now(ET).strftime('%H:%M %Z')}] Watching alert {last_msg['message_id']} "
+                      f"({last_msg.get('target') or TELEGRAM_TARGET}) for 👍")
+        watching = {a["message_id"] for a in pending}
+        acked = [check_reactions(a) for a in pending]
+        if not all(acked):
+            stop.wait(CHECK_INTERVAL)
+    print("M57 reaction monitor daemon stopped")
 
 
 def main():
@@ -116,6 +202,7 @@ def main():
     parser.add_argument("--mute-until", help="Mute until this time (ISO format, default: today's 23:59:59 ET)")
     parser.add_argument("--unmute", action="store_true", help="Unmute alerts immediately")
     parser.add_argument("--check", action="store_true", help="Check for 👍 reactions via OpenClaw")
+    parser.add_argument("--daemon", action="store_true", help="Stay resident, checking only while an alert is pending")
     
     args = parser.parse_args()
     
@@ -123,8 +210,10 @@ def main():
         unmute()
     elif args.mute_until:
         mute_until(args.mute_until)
+    elif args.daemon:
+        run_daemon()
     else:  # default: check reactions
-        check_reactions()
+        check_all()
 
 
 if __name__ == "__main__":
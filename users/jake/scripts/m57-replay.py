@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+M57 Replay — record, serve and replay SIRI StopMonitoring / VehicleMonitoring
+responses so the poll + alert + mute logic can be tested and benchmarked
+offline. This is the one replay path; tests/test_m57_replay.py drives run()
+with the recordings in tests/fixtures/m57-siri.
+
+  python3 m57-replay.py record DIR [--interval 30] [--count 240] [--vehicles]
+      Poll the primary subscription's stop (--vehicles: its line's
+      VehicleMonitoring feed) and save each raw response as
+      DIR/<UTC time>.json (DIR/<UTC time>-vm.json).
+
+  python3 m57-replay.py serve DIR [--port 8057] [--speed 10 | --step]
+      Local stub of /api/siri/stop-monitoring.json and
+      /api/siri/vehicle-monitoring.json, each answered from the recordings of
+      that kind. --speed plays the recordings on a simulated clock (10× real
+      time) with every timestamp shifted to "now", so the real poller works
+      against it:
+          M57_SIRI_BASE=http://127.0.0.1:8057 python3 m57-poll.py --daemon
+      --step returns the next recording on each request, timestamps untouched.
+
+  python3 m57-replay.py run DIR [--http] [--ack-after 120]
+      Drive a simulated morning through parse + alert + mute (nothing sent, no
+      state written) and report alert lead-time accuracy, missed buses and
+      poll-to-alert latency. --http fetches every tick through a --step stub
+      server on a local port, so latency includes the HTTP round trip.
+      --ack-after simulates a 👍 that many seconds after the first alert;
+      --api-only alerts on SIRI's ETA alone, to compare against the trajectory ETA.
+"""
+
+import argparse
+import json
+import re
+import statistics
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from dotenv_loader import load_dotenv
+from m57_alerting import process_status
+from m57_config import ET
+from m57_history import ARRIVED_WITHIN, ETACorrector
+from m57_siri import SiriClient, parse_arrivals, parse_vehicle_calls, response_time
+from m57_subscriptions import load_subscriptions
+from m57_trajectory import TrajectoryTracker
+load_dotenv()
+
+_ISO_RE = re.compile(r'"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:\d\d))"')
+
+STOP_MONITORING = "stop-monitoring"
+VEHICLE_MONITORING = "vehicle-monitoring"
+
+
+# ─── Recordings ──────────────────────────────────────────────────────────────
+
+def endpoint_of(data):
+    """Which SIRI endpoint a recorded response came from."""
+    delivery = data.get("Siri", {}).get("ServiceDelivery", {})
+    return VEHICLE_MONITORING if "VehicleMonitoringDelivery" in delivery else STOP_MONITORING
+
+
+def load_recordings(paths):
+    """[(response_time_utc, raw_text, endpoint), ...] sorted by time, from files and/or directories."""
+    files = []
+    for p in map(Path, paths):
+        files += sorted(p.glob("*.json")) if p.is_dir() else [p]
+    recs = []
+    for path in files:
+        text = path.read_text()
+        data = json.loads(text)
+        at = response_time(data) or datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+        recs.append((at, text, endpoint_of(data)))
+    recs.sort(key=lambda r: r[0])
+    return recs
+
+
+def shift_timestamps(text, offset):
+    """Move every ISO timestamp in a raw SIRI response by offset (a timedelta)."""
+    def shift(m):
+        dt = datetime.fromisoformat(m.group(1).replace("Z", "+00:00"))
+        return f'"{(dt + offset).isoformat()}"'
+    return _ISO_RE.sub(shift, text)
+
+
+def record(out_dir, interval, count, vehicles=False):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sub = load_subscriptions()[0]
+    client = SiriClient()
+    for i in range(count):
+        started = time.monotonic()
+        try:
+            if vehicles:
+                data = client.vehicle_monitoring(sub.line_ref)
+            else:
+                data = client.stop_monitoring(sub.stop_id, sub.line_ref)
+        except Exception as e:
+            print(f"  ⚠️  {e}")
+        else:
+            at = response_time(data) or datetime.now(timezone.utc)
+            path = out_dir / f"{at.strftime('%Y%m%dT%H%M%SZ')}{'-vm' if vehicles else ''}.json"
+            path.write_text(json.dumps(data))
+            print(f"[{i + 1}/{count}] {path.name}")
+        if i + 1 < count:
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    client.close()
+
+
+# ─── Stub server ─────────────────────────────────────────────────────────────
+
+class StubServer(ThreadingHTTPServer):
+    """Serves each endpoint's recordings on a simulated clock (speed) or one per request (step)."""
+
+    daemon_threads = True
+
+    def __init__(self, addr, recordings, speed=1.0, step=False):
+        super().__init__(addr, StubHandler)
+        self.recordings = {}   # endpoint → [(response_time_utc, raw_text), ...]
+        for at, text, endpoint in recordings:
+            self.recordings.setdefault(endpoint, []).append((at, text))
+        self.speed = speed
+        self.step = step
+        self.first = recordings[0][0]
+        self.started = time.monotonic()
+        self.served = {endpoint: 0 for endpoint in self.recordings}
+        self._lock = threading.Lock()
+
+    def next_response(self, endpoint):
+        """Raw response for a request to endpoint, or None if nothing of that kind was recorded."""
+        recordings = self.recordings.get(endpoint)
+        if not recordings:
+            return None
+        if self.step:
+            with self._lock:
+                i = min(self.served[endpoint], len(recordings) - 1)
+                self.served[endpoint] += 1
+            return recordings[i][1]
+
+        sim_now = self.first + timedelta(seconds=(time.monotonic() - self.started) * self.speed)
+        current = recordings[0]
+        for rec in recordings:
+            if rec[0] > sim_now:
+                break
+            current = rec
+        with self._lock:
+            self.served[endpoint] += 1
+        return shift_timestamps(current[1], datetime.now(timezone.utc) - sim_now)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        endpoint = path.removeprefix("/api/siri/").removesuffix(".json")
+        text = self.server.next_response(endpoint) if path.startswith("/api/siri/") else None
+        if text is None:
+            self.send_error(404)
+            return
+        body = text.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(recordings, port, speed, step):
+    server = StubServer(("127.0.0.1", port), recordings, speed=speed, step=step)
+    mode = "one recording per request" if step else f"{speed:g}× real time"
+    kinds = ", ".join(f"{len(recs)} {endpoint}" for endpoint, recs in server.recordings.items())
+    print(f"Serving {kinds} recording(s) on http://127.0.0.1:{server.server_port} ({mode})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+# ─── Simulated morning ───────────────────────────────────────────────────────
+
+def _pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def observed_arrivals(sightings):
+    """{vehicle: arrival_utc} for vehicles last seen within ARRIVED_WITHIN minutes of the stop."""
+    arrivals = {}
+    for vehicle, seen in sightings.items():
+        now_utc, bus = seen[-1]
+        if bus["minutes_away"] <= ARRIVED_WITHIN:
+            arrivals[vehicle] = datetime.fromisoformat(bus["expected_arrival"]).astimezone(timezone.utc)
+    return arrivals
+
+
+def _recorded_buses(data, endpoint, now_utc, sub):
+    """The subscription's buses from one recorded response, parsed as the poller would."""
+    if endpoint == VEHICLE_MONITORING:
+        return parse_vehicle_calls(data, now_utc, {sub.stop_id})[sub.stop_id]
+    return parse_arrivals(data, now_utc, sub.line_ref)
+
+
+def run(recordings, use_http=False, ack_after=None, api_only=False):
+    """
+    Replay recordings (from load_recordings) as one poll each, through the same
+    ETA correction, trajectory tracking and alert decision as the daemon, print
+    the report and return the alerts as [(poll time UTC, vehicle), ...].
+    """
+    sub = load_subscriptions()[0]
+    corrector = ETACorrector()
+    tracker = None if api_only else TrajectoryTracker()
+    state = {"alerted": {}}
+    sightings = {}        # vehicle → [(now_utc, bus), ...]
+    alerts = []           # (now_utc, vehicle)
+    tick_ms, alert_ms = [], []
+    muted_from = None
+
+    server = client = None
+    if use_http:
+        server = StubServer(("127.0.0.1", 0), recordings, step=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = SiriClient(f"http://127.0.0.1:{server.server_port}")
+
+    for now_utc, text, endpoint in recordings:
+        now_et = now_utc.astimezone(ET)
+        started = time.perf_counter()
+        if client is None:
+            data = json.loads(text)
+        elif endpoint == VEHICLE_MONITORING:
+            data = client.vehicle_monitoring(sub.line_ref)
+        else:
+            data = client.stop_monitoring(sub.stop_id, sub.line_ref)
+        buses = corrector.apply(_recorded_buses(data, endpoint, now_utc, sub), now_et)
+        if tracker:
+            tracker.apply(buses, now_utc.timestamp())
+        for b in buses:
+            if b["in_service"]:
+                sightings.setdefault(b["vehicle"], []).append((now_utc, b))
+
+        status = {"polled_at_et": now_et.strftime("%Y-%m-%d %H:%M:%S %Z"), "buses": buses, "error": None}
+        before = dict(state["alerted"])
+        muted = muted_from is not None and now_utc >= muted_from
+        process_status(status, now_et=now_et, send=lambda m, t: alert_ms.append((time.perf_counter() - started) * 1000),
+                       state=state, muted=muted, sub=sub)
+        tick_ms.append((time.perf_counter() - started) * 1000)
+
+        for key, ts in state["alerted"].items():
+            if before.get(key) != ts:
+                alerts.append((now_utc, key.split("_", 1)[1]))
+                if ack_after is not None and muted_from is None:
+                    muted_from = now_utc + timedelta(seconds=ack_after)
+
+    if server:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+    report(sub, recordings, alerts, observed_arrivals(sightings), tick_ms, alert_ms, muted_from)
+    return alerts
+
+
+def report(sub, recordings, alerts, arrivals, tick_ms, alert_ms, muted_from):
+    target = (sub.alert_min + sub.alert_max) / 2
+    print(f"\n─── Replay: {len(recordings)} poll(s), "
+          f"{recordings[0][0].astimezone(ET):%H:%M}–{recordings[-1][0].astimezone(ET):%H:%M} ET ───")
+
+    leads = []
+    alerted = set()
+    for at, vehicle in alerts:
+        alerted.add(vehicle)
+        arrived = arrivals.get(vehicle)
+        if arrived is None:
+            print(f"  📨 {at.astimezone(ET):%H:%M:%S} {vehicle}: arrival not observed")
+            continue
+        lead = (arrived - at).total_seconds() / 60
+        leads.append(lead)
+        ok = "✅" if sub.alert_min <= lead <= sub.alert_max else "⚠️ "
+        print(f"  📨 {at.astimezone(ET):%H:%M:%S} {vehicle}: arrived {lead:.1f} min later {ok}")
+
+    missed = suppressed = 0
+    for vehicle, arrived in sorted(arrivals.items(), key=lambda a: a[1]):
+        due = arrived - timedelta(minutes=target)
+        if vehicle in alerted or not sub.in_window(due.astimezone(ET)):
+            continue
+        if muted_from is not None and due >= muted_from:
+            suppressed += 1
+            continue
+        missed += 1
+        print(f"  ❌ missed {vehicle} (arrived {arrived.astimezone(ET):%H:%M:%S})")
+
+    print(f"\nAlerts: {len(alerts)}  |  arrivals observed: {len(arrivals)}  |  missed: {missed}"
+          + (f"  |  muted: {suppressed}" if muted_from else ""))
+    if leads:
+        in_band = sum(sub.alert_min <= lead <= sub.alert_max for lead in leads)
+        print(f"Lead time: mean {statistics.mean(leads):.1f} min, "
+              f"mean |error| vs {target:g} min {statistics.mean(abs(l - target) for l in leads):.1f} min, "
+              f"{in_band}/{len(leads)} inside {sub.alert_min}–{sub.alert_max} min")
+    print(f"Per-poll processing: p50 {_pct(tick_ms, 50):.2f} ms, p95 {_pct(tick_ms, 95):.2f} ms, max {max(tick_ms):.2f} ms")
+    if alert_ms:
+        print(f"Poll → alert handoff: p50 {_pct(alert_ms, 50):.2f} ms, max {max(alert_ms):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, serve and replay M57 SIRI responses")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("record", help="Save live SIRI responses to a directory")
+    p.add_argument("dir")
+    p.add_argument("--interval", type=float, default=30, help="Seconds between polls (default: 30)")
+    p.add_argument("--count", type=int, default=240, help="Number of polls (default: 240 = 2h at 30s)")
+    p.add_argument("--vehicles", action="store_true", help="Record the line's VehicleMonitoring feed instead of the stop")
+
+    p = subparsers.add_parser("serve", help="Serve recordings from a local stub SIRI server")
+    p.add_argument("paths", nargs="+", metavar="DIR_OR_JSON")
+    p.add_argument("--port", type=int, default=8057)
+    p.add_argument("--speed", type=float, default=1.0, help="Simulated-clock speed multiplier (default: 1)")
+    p.add_argument("--step", action="store_true", help="Return the next recording on every request")
+
+    p = subparsers.add_parser("run", help="Replay a simulated morning and report alert accuracy")
+    p.add_argument("paths", nargs="+", metavar="DIR_OR_JSON")
+    p.add_argument("--http", action="store_true", help="Fetch through a local stub server")
+    p.add_argument("--ack-after", type=float, metavar="SECONDS", help="Simulate a 👍 this long after the first alert")
+    p.add_argument("--api-only", action="store_true", help="Alert on SIRI's ETA alone (no trajectory estimate), for comparison")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.dir, args.interval, args.count, vehicles=args.vehicles)
+        return
+
+    recordings = load_recordings(args.paths)
+    if not recordings:
+        parser.error("no recordings found")
+    if args.command == "serve":
+        serve(recordings, args.port, args.speed, args.step)
+    else:
+        run(recordings, use_http=args.http, ack_after=args.ack_after, api_only=args.api_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+M57 Schedule Build — precompute the static-schedule fallback index.
+
+Reads a GTFS feed (zip or unpacked directory, e.g. MTA's Manhattan bus feed
+gtfs_m.zip) and writes m57-schedule.idx: for every subscription's
+(stop, line), the sorted scheduled stop times of each service day the feed
+covers. The poller memory-maps it (m57_schedule) and uses it only when the
+realtime API fails.
+
+Run it whenever a new feed is downloaded:
+  python3 m57-schedule-build.py ~/gtfs/gtfs_m.zip
+"""
+
+import argparse
+import csv
+import io
+import sys
+import zipfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from m57_schedule import SCHEDULE_FILE, write_index
+from m57_subscriptions import load_subscriptions
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def gtfs_id(ref):
+    """SIRI refs carry an agency prefix GTFS ids lack: 'MTA_405565' → '405565', 'MTA NYCT_M57' → 'M57'."""
+    return ref.split("_", 1)[1] if "_" in ref else ref
+
+
+def open_table(feed, name):
+    """csv.DictReader over one GTFS table (None if the feed doesn't have it)."""
+    if feed.is_dir():
+        path = feed / name
+        return csv.DictReader(open(path, newline="", encoding="utf-8-sig")) if path.exists() else None
+    zf = zipfile.ZipFile(feed)
+    if name not in zf.namelist():
+        return None
+    return csv.DictReader(io.TextIOWrapper(zf.open(name), encoding="utf-8-sig", newline=""))
+
+
+def parse_gtfs_time(value):
+    h, m, s = value.strip().split(":")
+    return int(h) * 3600 + int(m) * 60 + int(s)
+
+
+def parse_gtfs_date(value):
+    return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+
+
+def service_days(feed):
+    """{service_id: set of dates} from calendar.txt and calendar_dates.txt."""
+    days = {}
+    for row in open_table(feed, "calendar.txt") or ():
+        d, end = parse_gtfs_date(row["start_date"]), parse_gtfs_date(row["end_date"])
+        active = days.setdefault(row["service_id"], set())
+        while d <= end:
+            if row[WEEKDAYS[d.weekday()]] == "1":
+                active.add(d)
+            d += timedelta(days=1)
+    for row in open_table(feed, "calendar_dates.txt") or ():
+        active = days.setdefault(row["service_id"], set())
+        d = parse_gtfs_date(row["date"])
+        if row["exception_type"] == "1":
+            active.add(d)
+        else:
+            active.discard(d)
+    return days
+
+
+def build(feed, out):
+    subs = load_subscriptions()
+    watches = {(gtfs_id(s.stop_id), gtfs_id(s.line_ref)): s.watch for s in subs}
+    routes = {route for _, route in watches}
+    stops = {stop for stop, _ in watches}
+
+    trips = {}   # trip_id → (route_id, service_id)
+    for row in open_table(feed, "trips.txt"):
+        if row["route_id"] in routes:
+            trips[row["trip_id"]] = (row["route_id"], row["service_id"])
+
+    by_service = {}   # (watch, service_id) → [seconds]
+    for row in open_table(feed, "stop_times.txt"):
+        if row["stop_id"] not in stops:
+            continue
+        trip = trips.get(row["trip_id"])
+        if trip is None or (row["stop_id"], trip[0]) not in watches:
+            continue
+        when = row.get("departure_time") or row.get("arrival_time")
+        if not when:
+            continue
+        by_service.setdefault((watches[(row["stop_id"], trip[0])], trip[1]), []).append(parse_gtfs_time(when))
+
+    days = service_days(feed)
+    schedules = {}
+    for (watch, service_id), times in by_service.items():
+        for d in days.get(service_id, ()):
+            day_key = d.year * 10000 + d.month * 100 + d.day
+            schedules.setdefault(watch, {}).setdefault(day_key, []).extend(times)
+
+    for watch in watches.values():
+        if watch not in schedules:
+            print(f"⚠️  No scheduled stop times for {watch[0]} on {watch[1]}", file=sys.stderr)
+    n_keys, n_entries, n_times = write_index(out, schedules)
+    print(f"✅ Wrote {out.name}: {n_keys} stop/line(s), {n_entries} service day(s), {n_times} stop time(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the M57 static-schedule fallback index from GTFS")
+    parser.add_argument("feed", type=Path, help="GTFS zip or directory")
+    parser.add_argument("--out", type=Path, default=SCHEDULE_FILE)
+    args = parser.parse_args()
+    build(args.feed, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+M57 alert evaluation — decides whether a poll result warrants a Telegram alert.
+
+Used in-process by the poller daemon (on every fresh poll, so alerts go out
+seconds after the API data) and by m57-alert.py for one-off runs against
+the status snapshots. Band, window and Telegram target come from the
+Subscription being checked (m57_subscriptions). Alerts are queued on
+`notifier` and delivered by its worker thread; one-off callers should
+notifier.flush() before exiting.
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from m57_config import ET
+from m57_notify import Notifier
+from m57_state import locked, read_json, write_json
+from m57_subscriptions import default_subscription
+
+ALERT_STATE_FILE = Path(__file__).parent / "m57-alert-state.json"
+MUTE_FILE = Path(__file__).parent / "m57-mute.json"
+LAST_MESSAGE_FILE = Path(__file__).parent / "m57-last-alert.json"
+
+RESEND_COOLDOWN = 300  # don't re-alert same bus within 5 minutes (seconds)
+SUMMARY_DAYS = 90      # daily summaries kept in the alert state
+
+
+def load_alert_state():
+    return read_json(ALERT_STATE_FILE, {"alerted": {}})
+
+
+def compact_alert_state(state, today_str):
+    """
+    Keep only today's per-bus entries in state["alerted"]; fold earlier days into
+    state["days"][day] = {"alerts", "first", "last"} (ET times) and keep
+    SUMMARY_DAYS of those. Returns True if anything changed.
+    """
+    alerted = state.setdefault("alerted", {})
+    stale = [k for k in alerted if not k.startswith(today_str + "_")]
+    days = state.setdefault("days", {})
+    for key in stale:
+        ts = alerted.pop(key)
+        day = key.split("_", 1)[0]
+        at = datetime.fromtimestamp(ts, ET).strftime("%H:%M:%S")
+        summary = days.setdefault(day, {"alerts": 0, "first": at, "last": at})
+        summary["alerts"] += 1
+        summary["first"] = min(summary["first"], at)
+        summary["last"] = max(summary["last"], at)
+    old = sorted(days)[:-SUMMARY_DAYS]
+    for day in old:
+        del days[day]
+    return bool(stale or old)
+
+
+def save_alert_state(state):
+    write_json(ALERT_STATE_FILE, state)
+
+
+def is_muted(now_utc=None, target=None):
+    """
+    Check if alerts are muted until a specific time — for everyone
+    ("muted_until") or just this target ("targets": {target: until}).
+    """
+    mute = read_json(MUTE_FILE, {})
+    now_utc = now_utc or datetime.now(timezone.utc)
+    for mute_until_str in (mute.get("muted_until"), mute.get("targets", {}).get(target)):
+        if not mute_until_str:
+            continue
+        try:
+            mute_until = datetime.fromisoformat(mute_until_str)
+        except ValueError:
+            print(f"Ignoring bad muted_until value: {mute_until_str!r}", file=sys.stderr)
+            continue
+        if now_utc < mute_until:
+            return True
+    return False
+
+
+def read_last_alerts():
+    """
+    {target: {"message_id", "target", "sent_at"[, "acknowledged_at"]}} — the
+    last alert sent to each Telegram target, for the reaction monitor.
+    """
+    data = read_json(LAST_MESSAGE_FILE, {})
+    if "message_id" in data:   # single-alert file from before per-target state
+        return {data.get("target") or "": data}
+    return data.get("targets", {})
+
+
+def _record_sent(message, target, result):
+    """Notifier callback: remember the alert's message ID, per target, for the reaction monitor."""
+    if result.get("message_id"):
+        with locked(LAST_MESSAGE_FILE):
+            alerts = read_last_alerts()
+            alerts[target] = {
+                "message_id": result["message_id"],
+                "target": target,
+                "sent_at": datetime.now(timezone.utc).isoformat()
+            }
+            write_json(LAST_MESSAGE_FILE, {"targets": alerts}, indent=None)
+
+
+notifier = Notifier(on_sent=_record_sent)
+
+
+def send_notification(message, target=None):
+    """Queue an alert for delivery (see m57_notify); returns without waiting."""
+    if target is None:
+        target = os.environ.get("TELEGRAM_TARGET", "")
+    notifier.submit(message, target)
+
+
+def bus_minutes(bus):
+    """
+    Best available minutes-away estimate for the alert decision: the poller's
+    eta_minutes (trajectory or corrected API figure), else the history-corrected
+    API figure, else SIRI's own.
+    """
+    if "eta_minutes" in bus:
+        return bus["eta_minutes"]
+    return bus.get("corrected_minutes_away", bus["minutes_away"])
+
+
+def format_alert(bus, sub=None):
+    mins = bus_minutes(bus)
+    line = (sub.line_ref if sub else "").rsplit("_", 1)[-1] or "M57"
+    if bus.get("scheduled"):
+        arr = datetime.fromisoformat(bus["expected_arrival"]).astimezone(ET)
+        return (
+            f"🚌 {line} alert (schedule — live tracking is down): next bus is due at "
+            f"{arr.strftime('%-I:%M %p')} (~{mins:.0f} min). "
+            f"Time to head out!\n\n👍 React with thumbs up to mute for the day."
+        )
+    try:
+        arr = datetime.fromisoformat(bus["expected_arrival"]).astimezone(ET)
+        arr_str = arr.strftime("%-I:%M %p")
+    except Exception:
+        arr_str = f"~{mins:.0f} min"
+    return (
+        f"🚌 {line} alert! Bus is {bus['stops_away']} stops away "
+        f"(~{mins:.0f} min) — arriving around {arr_str}. "
+        f"Time to head out!\n\n👍 React with thumbs up to mute for the day."
+    )
+
+
+def evaluate(buses, now_et, alerted, sub=None):
+    """
+    Pure alert decision: returns [(alert_key, bus), ...] for in-service buses
+    inside the subscription's alert band that weren't alerted within RESEND_COOLDOWN.
+    Uses the history-corrected ETA when the poller supplied one.
+    """
+    sub = sub or default_subscription()
+    now_ts = now_et.timestamp()
+    today_str = now_et.strftime("%Y-%m-%d")
+    due = []
+    for bus in buses:
+        mins = bus_minutes(bus)
+        vehicle = bus["vehicle"]
+        in_service = bus.get("in_service", True)
+
+        print(f"  Bus {vehicle}: {mins:.1f} min | {bus['distance_readable']} | in_service={in_service}")
+
+        if not in_service or not (sub.alert_min <= mins <= sub.alert_max):
+            continue
+
+        alert_key = sub.alert_key(today_str, vehicle)
+        if now_ts - alerted.get(alert_key, 0) < RESEND_COOLDOWN:
+            print(f"  → Already alerted this bus recently, skipping.")
+            continue
+        due.append((alert_key, bus))
+    return due
+
+
+def process_status(status, now_et=None, send=send_notification, state=None, muted=None, sub=None):
+    """
+    Run the alert decision for one poll result and send any alerts.
+    send: called as send(message, target).
+    state: alert-state dict to use in place of ALERT_STATE_FILE (replay/dry runs);
+    when omitted, state is loaded from and saved back to the file.
+    muted: override the MUTE_FILE check (None = read the file).
+    sub: the Subscription this status belongs to (default: the m57_config one).
+    Returns the list of messages sent.
+    """
+    now_et = now_et or datetime.now(ET)
+    sub = sub or default_subscription()
+
+    if muted is None:
+        muted = is_muted(now_et.astimezone(timezone.utc), sub.target)
+    if muted:
+        print(f"[{now_et.strftime('%H:%M %Z')}] Alerts muted, skipping.")
+        return []
+
+    if not sub.in_window(now_et):
+        print(f"[{now_et.strftime('%H:%M %Z')}] Outside alert window, skipping.")
+        return []
+
+    if status.get("error"):
+        if not status.get("schedule_fallback"):
+            print(f"Last poll had error: {status['error']}")
+            return []
+        print(f"Last poll had error: {status['error']} — falling back to the static schedule")
+        buses = status["schedule_fallback"]
+    else:
+        buses = status.get("buses", [])
+    print(f"[{now_et.strftime('%H:%M %Z')}] Checking {len(buses)} bus(es) from poll at {status.get('polled_at_et', 'unknown')}")
+
+    if state is not None:
+        return _alert(buses, now_et, state, send, sub)
+    with locked(ALERT_STATE_FILE):
+        state = load_alert_state()
+        compacted = compact_alert_state(state, now_et.strftime("%Y-%m-%d"))
+        sent = _alert(buses, now_et, state, send, sub)
+        if sent or compacted:
+            save_alert_state(state)
+    return sent
+
+
+def _alert(buses, now_et, state, send, sub):
+    compact_alert_state(state, now_et.strftime("%Y-%m-%d"))
+    alerted = state["alerted"]
+    sent = []
+    for alert_key, bus in evaluate(buses, now_et, alerted, sub):
+        msg = format_alert(bus, sub)
+        send(msg, sub.target)
+        alerted[alert_key] = now_et.timestamp()
+        sent.append(msg)
+    return sent
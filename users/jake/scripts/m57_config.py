@@ -0,0 +1,25 @@
+"""
+Shared M57 settings — stop, line, alert band and commute window — so the
+poller, alerter and reaction monitor agree on them.
+"""
+
+from zoneinfo import ZoneInfo
+
+ET = ZoneInfo("America/New_York")
+
+STOP_ID   = "MTA_405565"       # West End Av / W 61 St (eastbound M57)
+STOP_NAME = "West End Av / W 61 St (eastbound M57)"
+LINE_REF  = "MTA NYCT_M57"
+
+ALERT_MIN = 8    # lower bound: alert if bus is >= this many minutes away
+ALERT_MAX = 13   # upper bound: alert if bus is <= this many minutes away
+
+# Alert window: 6:30am–8:30am ET, weekdays
+WINDOW_START = (6, 30)
+WINDOW_END   = (8, 30)
+WINDOW_DAYS  = (0, 1, 2, 3, 4)   # Monday–Friday
+
+
+def in_window(now_et):
+    t = (now_et.hour, now_et.minute)
+    return now_et.weekday() in WINDOW_DAYS and WINDOW_START <= t < WINDOW_END
@@ -0,0 +1,185 @@
+"""
+M57 arrival history and ETA correction.
+
+Raw store: one binary file per ET day under m57-history/, one fixed-size row
+per (vehicle, poll):
+
+    <IIfhI  poll_ts, vehicle_no, minutes_away, stops_away (-1 = unknown), expected_arrival_ts
+
+Rollups (m57-history/rollup.json): once a day is complete its rows are reduced
+to per-hour-of-day prediction error stats — how late buses actually arrived
+compared to what SIRI's ExpectedArrivalTime promised 5–20 minutes out.
+
+ETACorrector turns recent rollups into a per-hour bias (minutes) and adds a
+corrected_minutes_away to each bus before the alert band is applied.
+
+Raw files are kept RAW_RETENTION_DAYS, rollups ROLLUP_RETENTION_DAYS.
+"""
+
+import re
+import struct
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from m57_config import ET
+from m57_state import locked, read_json, write_json
+
+HISTORY_DIR = Path(__file__).parent / "m57-history"
+ROLLUP_FILE = HISTORY_DIR / "rollup.json"
+
+ROW = struct.Struct("<IIfhI")
+
+RAW_RETENTION_DAYS = 14
+ROLLUP_RETENTION_DAYS = 120
+MODEL_DAYS = 28            # rollup days that feed the correction model
+MIN_SAMPLES = 20           # per hour, before a bias is trusted
+MAX_BIAS = 5.0             # minutes; clamp so one bad week can't swamp SIRI
+HORIZON = (5.0, 20.0)      # prediction horizons (minutes away) used for error stats
+TRIP_GAP = 30 * 60         # seconds without a sighting → a new trip for that vehicle
+ARRIVED_WITHIN = 2.0       # last sighting this close (minutes) counts as an observed arrival
+
+_VEHICLE_RE = re.compile(r'(\d+)$')
+
+
+def _day_file(day):
+    return HISTORY_DIR / f"{day.isoformat()}.bin"
+
+
+def vehicle_no(vehicle_ref):
+    """'MTA NYCT_7123' → 7123 (0 if there's no trailing number)."""
+    m = _VEHICLE_RE.search(vehicle_ref or "")
+    return int(m.group(1)) if m else 0
+
+
+def append(now_utc, buses):
+    """Append one row per in-service bus for this poll to today's file."""
+    rows = bytearray()
+    poll_ts = int(now_utc.timestamp())
+    for b in buses:
+        if not b.get("in_service", True):
+            continue
+        try:
+            expected = int(datetime.fromisoformat(b["expected_arrival"]).timestamp())
+        except (KeyError, ValueError):
+            continue
+        stops = b.get("stops_away")
+        rows += ROW.pack(
+            poll_ts,
+            vehicle_no(b.get("vehicle")),
+            float(b["minutes_away"]),
+            stops if isinstance(stops, int) and -1 <= stops < 32767 else -1,
+            expected,
+        )
+    if not rows:
+        return
+    HISTORY_DIR.mkdir(exist_ok=True)
+    with open(_day_file(now_utc.astimezone(ET).date()), "ab") as f:
+        f.write(rows)
+
+
+def read_day(day):
+    """All rows for an ET day as tuples (poll_ts, vehicle, minutes_away, stops_away, expected_ts)."""
+    path = _day_file(day)
+    if not path.exists():
+        return []
+    data = path.read_bytes()
+    usable = len(data) - len(data) % ROW.size   # ignore a torn final row
+    return list(ROW.iter_unpack(data[:usable]))
+
+
+def prediction_errors(rows):
+    """
+    Observed (poll_ts, error_minutes) pairs for one day: for every trip whose
+    arrival we saw, how far each earlier in-horizon prediction was off
+    (positive = bus arrived later than predicted).
+    """
+    by_vehicle = {}
+    for row in sorted(rows):
+        by_vehicle.setdefault(row[1], []).append(row)
+
+    errors = []
+    for vehicle, vrows in by_vehicle.items():
+        if not vehicle:
+            continue
+        trip = []
+        for row in vrows + [None]:
+            if trip and (row is None or row[0] - trip[-1][0] > TRIP_GAP or row[2] > trip[-1][2] + 10):
+                last = trip[-1]
+                if last[2] <= ARRIVED_WITHIN:
+                    arrived = last[4]
+                    errors += [(r[0], (arrived - r[4]) / 60)
+                               for r in trip if HORIZON[0] <= r[2] <= HORIZON[1]]
+                trip = []
+            if row is not None:
+                trip.append(row)
+    return errors
+
+
+def rollup_day(day):
+    """Per-hour error stats for one ET day: {"HH": {"n", "sum", "sumsq"}}."""
+    rows = read_day(day)
+    hours = {}
+    for poll_ts, err in prediction_errors(rows):
+        hour = f"{datetime.fromtimestamp(poll_ts, ET).hour:02d}"
+        h = hours.setdefault(hour, {"n": 0, "sum": 0.0, "sumsq": 0.0})
+        h["n"] += 1
+        h["sum"] += err
+        h["sumsq"] += err * err
+    return {"rows": len(rows), "hours": hours}
+
+
+def compact(today=None):
+    """Roll up every finished day not yet rolled up, then apply retention."""
+    today = today or datetime.now(ET).date()
+    if not HISTORY_DIR.exists():
+        return
+    with locked(ROLLUP_FILE):
+        rollup = read_json(ROLLUP_FILE, {})
+        before = len(rollup)
+        for path in sorted(HISTORY_DIR.glob("*.bin")):
+            try:
+                day = date.fromisoformat(path.stem)
+            except ValueError:
+                continue
+            if day < today and path.stem not in rollup:
+                rollup[path.stem] = rollup_day(day)
+            if (today - day).days > RAW_RETENTION_DAYS:
+                path.unlink()
+        cutoff = (today - timedelta(days=ROLLUP_RETENTION_DAYS)).isoformat()
+        kept = {d: v for d, v in rollup.items() if d >= cutoff}
+        if len(kept) != before or len(rollup) != before:
+            write_json(ROLLUP_FILE, kept, indent=None)
+
+
+class ETACorrector:
+    """Per-hour-of-day bias model built from the last MODEL_DAYS of rollups."""
+
+    def __init__(self):
+        self._built_for = None
+        self.bias = {}
+
+    def _build(self, today):
+        rollup = read_json(ROLLUP_FILE, {})
+        cutoff = (today - timedelta(days=MODEL_DAYS)).isoformat()
+        totals = {}
+        for day, stats in rollup.items():
+            if day < cutoff:
+                continue
+            for hour, h in stats.get("hours", {}).items():
+                t = totals.setdefault(int(hour), [0, 0.0])
+                t[0] += h["n"]
+                t[1] += h["sum"]
+        self.bias = {
+            hour: max(-MAX_BIAS, min(MAX_BIAS, s / n))
+            for hour, (n, s) in totals.items() if n >= MIN_SAMPLES
+        }
+        self._built_for = today
+
+    def apply(self, buses, now_et):
+        """Add corrected_minutes_away to each bus (same as minutes_away if no model yet)."""
+        if self._built_for != now_et.date():
+            self._build(now_et.date())
+        bias = self.bias.get(now_et.hour, 0.0)
+        for b in buses:
+            b["corrected_minutes_away"] = round(b["minutes_away"] + bias, 1)
+        return buses
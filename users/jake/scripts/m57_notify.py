@@ -0,0 +1,157 @@
+"""
+Notification dispatch for M57 alerts.
+
+Notifier owns an in-memory queue and one worker thread, so submit() returns
+immediately and alert evaluation never waits on delivery. The worker hands
+each message to a backend, retrying failures a bounded number of times with
+backoff.
+
+Backends implement send(message, target) → dict (at least "message_id"),
+raising on failure:
+  OpenClawBackend  the openclaw CLI with --json output
+  StubBackend      records messages in memory — tests, replays, dry runs
+
+Set M57_NOTIFY_BACKEND=stub to use the stub without code changes.
+"""
+
+import itertools
+import json
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+
+OPENCLAW = "/home/exedev/.npm-global/bin/openclaw"
+SEND_TIMEOUT = 15      # seconds per CLI attempt
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 2.0    # seconds; doubles per attempt
+
+_MESSAGE_ID_RE = re.compile(r"Message ID: (\d+)")
+
+
+class NotifyError(Exception):
+    pass
+
+
+class OpenClawBackend:
+    """Send through `openclaw message send --json` and parse the structured reply."""
+
+    def __init__(self, channel="telegram", binary=OPENCLAW, timeout=SEND_TIMEOUT):
+        self.channel = channel
+        self.binary = binary
+        self.timeout = timeout
+
+    def send(self, message, target):
+        try:
+            result = subprocess.run(
+                [
+                    self.binary, "message", "send",
+                    "--channel", self.channel,
+                    "--target", target,
+                    "--message", message,
+                    "--json",
+                ],
+                capture_output=True, text=True, timeout=self.timeout
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise NotifyError(str(e)) from e
+        if result.returncode != 0:
+            raise NotifyError(result.stderr.strip()[:200] or f"exit {result.returncode}")
+        return {"message_id": _message_id(result.stdout), "raw": result.stdout}
+
+
+def _message_id(stdout):
+    """Message ID from the CLI's JSON reply (older CLIs only print "Message ID: N")."""
+    try:
+        data = json.loads(stdout)
+    except ValueError:
+        match = _MESSAGE_ID_RE.search(stdout)
+        return match.group(1) if match else None
+    if isinstance(data, dict):
+        data = data.get("result", data)
+        for key in ("messageId", "message_id", "id"):
+            if data.get(key) is not None:
+                return str(data[key])
+    return None
+
+
+class StubBackend:
+    """In-memory backend: records (message, target) and hands out fake message IDs."""
+
+    def __init__(self, fail_times=0):
+        self.sent = []
+        self.fail_times = fail_times   # fail this many sends first (to exercise retries)
+        self._ids = itertools.count(1)
+
+    def send(self, message, target):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise NotifyError("stub failure")
+        self.sent.append((message, target))
+        return {"message_id": str(next(self._ids))}
+
+
+def default_backend():
+    if os.environ.get("M57_NOTIFY_BACKEND") == "stub":
+        return StubBackend()
+    return OpenClawBackend()
+
+
+class Notifier:
+    """
+    Queue + worker thread in front of a backend.
+    on_sent(message, target, result) is called from the worker after each delivery.
+    """
+
+    def __init__(self, backend=None, on_sent=None, max_attempts=MAX_ATTEMPTS, backoff=RETRY_BACKOFF):
+        self.backend = backend or default_backend()
+        self.on_sent = on_sent
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, message, target):
+        """Queue a message for delivery and return immediately."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="m57-notifier", daemon=True)
+                self._worker.start()
+        self._queue.put((message, target))
+
+    def flush(self):
+        """Block until everything queued so far has been delivered or given up on."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            message, target = self._queue.get()
+            try:
+                self._deliver(message, target)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, message, target):
+        delay = self.backoff
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = self.backend.send(message, target)
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    print(f"Notify failed after {attempt} attempt(s): {e}", file=sys.stderr)
+                    return
+                print(f"Notify attempt {attempt} failed ({e}), retrying in {delay:.0f}s", file=sys.stderr)
+                time.sleep(delay)
+                delay *= 2
+                continue
+            print(f"Notified: {message[:100]}")
+            if self.on_sent:
+                try:
+                    self.on_sent(message, target, result)
+                except Exception as e:
+                    print(f"Notify callback error: {e}", file=sys.stderr)
+            return
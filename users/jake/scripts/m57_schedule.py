@@ -0,0 +1,151 @@
+"""
+GTFS static-schedule fallback for when the SIRI realtime API is down.
+
+m57-schedule-build.py turns a GTFS feed into m57-schedule.idx once, offline.
+Here the index is memory-mapped and searched in place (bisect over a
+memoryview), so a lookup doesn't parse anything.
+
+Index layout (little-endian):
+
+    header   MAGIC, u32 n_keys, u32 n_entries
+    keys     n_keys × KEY_SIZE bytes: "stop_id|line_ref", NUL-padded
+    entries  n_entries × (u32 key_no, u32 yyyymmdd, u32 first_time, u32 count),
+             sorted by (key_no, date)
+    times    u32 seconds after the service day's midnight (may exceed 86400
+             for after-midnight trips), sorted within each entry
+"""
+
+import mmap
+import struct
+from bisect import bisect_left
+from datetime import datetime, time as dtime, timedelta
+from pathlib import Path
+
+SCHEDULE_FILE = Path(__file__).parent / "m57-schedule.idx"
+
+MAGIC = b"M57SCHD1"
+HEADER = struct.Struct(f"<{len(MAGIC)}sII")
+KEY_SIZE = 48
+ENTRY = struct.Struct("<IIII")
+
+
+def schedule_key(stop_id, line_ref):
+    return f"{stop_id}|{line_ref}"
+
+
+def write_index(path, schedules):
+    """schedules: {(stop_id, line_ref): {yyyymmdd: [seconds, ...]}} → index file at path."""
+    keys = sorted(schedules)
+    entries, times = [], []
+    for key_no, key in enumerate(keys):
+        for day in sorted(schedules[key]):
+            day_times = sorted(set(schedules[key][day]))
+            entries.append((key_no, day, len(times), len(day_times)))
+            times += day_times
+
+    out = bytearray(HEADER.pack(MAGIC, len(keys), len(entries)))
+    for key in keys:
+        encoded = schedule_key(*key).encode()
+        if len(encoded) > KEY_SIZE:
+            raise ValueError(f"schedule key too long: {encoded!r}")
+        out += encoded.ljust(KEY_SIZE, b"\0")
+    for entry in entries:
+        out += ENTRY.pack(*entry)
+    out += struct.pack(f"<{len(times)}I", *times)
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(out)
+    tmp.replace(path)
+    return len(keys), len(entries), len(times)
+
+
+class ScheduleIndex:
+    """Read-only, memory-mapped view of an index written by write_index()."""
+
+    def __init__(self, path=SCHEDULE_FILE):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_keys, n_entries = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an M57 schedule index")
+        view = memoryview(self._mm)
+        keys_end = HEADER.size + n_keys * KEY_SIZE
+        entries_end = keys_end + n_entries * ENTRY.size
+        if entries_end > len(self._mm) or (len(self._mm) - entries_end) % 4:
+            raise ValueError(f"{path} is truncated")
+        self._keys = {
+            bytes(view[HEADER.size + i * KEY_SIZE:HEADER.size + (i + 1) * KEY_SIZE]).rstrip(b"\0").decode(): i
+            for i in range(n_keys)
+        }
+        self._entries = view[keys_end:entries_end].cast("I")
+        self._times = view[entries_end:].cast("I")
+        self._n_entries = n_entries
+
+    def day_times(self, stop_id, line_ref, day):
+        """Sorted seconds-after-midnight memoryview for one service day (empty if none)."""
+        key_no = self._keys.get(schedule_key(stop_id, line_ref))
+        if key_no is None:
+            return self._times[0:0]
+        ent = self._entries
+        target = (key_no, day.year * 10000 + day.month * 100 + day.day)
+        i = bisect_left(range(self._n_entries), target, key=lambda n: (ent[4 * n], ent[4 * n + 1]))
+        if i == self._n_entries or (ent[4 * i], ent[4 * i + 1]) != target:
+            return self._times[0:0]
+        first, count = ent[4 * i + 2], ent[4 * i + 3]
+        return self._times[first:first + count]
+
+    def next_departures(self, stop_id, line_ref, now_et, limit=3):
+        """Next scheduled departures after now_et as aware ET datetimes."""
+        found = []
+        for day in (now_et.date() - timedelta(days=1), now_et.date()):
+            midnight = datetime.combine(day, dtime(0), tzinfo=now_et.tzinfo)
+            secs = self.day_times(stop_id, line_ref, day)
+            now_secs = int((now_et - midnight).total_seconds())
+            i = bisect_left(secs, now_secs)
+            found += [midnight + timedelta(seconds=s) for s in secs[i:i + limit]]
+        return sorted(found)[:limit]
+
+
+_index = None
+_index_version = None    # (path, mtime) _index was loaded from
+
+
+def load_index(path=None):
+    """
+    Shared ScheduleIndex, re-mapped when the file is rebuilt; None if there is
+    no index or it can't be read (logged once per version of the file).
+    """
+    global _index, _index_version
+    path = path or SCHEDULE_FILE
+    try:
+        mtime = Path(path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if (str(path), mtime) != _index_version:
+        try:
+            _index = ScheduleIndex(path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"  ⚠️  schedule index unusable, no fallback until it is rebuilt: {e}")
+            _index = None
+        _index_version = (str(path), mtime)
+    return _index
+
+
+def scheduled_buses(sub, now_et, limit=3):
+    """Bus dicts (same shape as realtime ones, plus "scheduled": True) from the static schedule."""
+    index = load_index()
+    if index is None:
+        return []
+    buses = []
+    for at in index.next_departures(sub.stop_id, sub.line_ref, now_et, limit):
+        buses.append({
+            "vehicle": f"scheduled {at:%H:%M}",
+            "minutes_away": round((at - now_et).total_seconds() / 60, 1),
+            "stops_away": "?",
+            "distance_readable": "scheduled",
+            "expected_arrival": at.isoformat(),
+            "in_service": True,
+            "scheduled": True,
+        })
+    return buses
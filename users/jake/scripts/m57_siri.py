@@ -0,0 +1,193 @@
+"""
+MTA BusTime SIRI client and response parsing, shared by the M57 poller and
+the replay harness (m57-replay.py).
+
+The API base defaults to https://bustime.mta.info; set M57_SIRI_BASE (e.g.
+http://127.0.0.1:8057 for `m57-replay.py serve`) to point everything at
+another server.
+"""
+
+import http.client
+import json
+import os
+import urllib.parse
+from datetime import datetime, timezone
+
+DEFAULT_SIRI_BASE = "https://bustime.mta.info"
+HTTP_TIMEOUT = 10
+
+
+class SiriClient:
+    """SIRI StopMonitoring / VehicleMonitoring client that reuses one keep-alive HTTP(S) connection."""
+
+    def __init__(self, base=None, timeout=HTTP_TIMEOUT):
+        url = urllib.parse.urlsplit(base or os.environ.get("M57_SIRI_BASE") or DEFAULT_SIRI_BASE)
+        self.host = url.netloc
+        self.secure = url.scheme != "http"
+        self.timeout = timeout
+        self._conn = None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _get(self, path):
+        if self._conn is None:
+            conn_class = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+            self._conn = conn_class(self.host, timeout=self.timeout)
+        self._conn.request("GET", path, headers={"User-Agent": "M57Monitor/1.0"})
+        resp = self._conn.getresponse()
+        body = resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status} {resp.reason}")
+        if resp.will_close:
+            self.close()
+        return json.loads(body)
+
+    def _get_retry(self, path):
+        """_get, retried once on a stale keep-alive connection."""
+        try:
+            return self._get(path)
+        except (http.client.HTTPException, ConnectionError, OSError):
+            self.close()
+            return self._get(path)
+
+    def stop_monitoring(self, stop_id, line_ref=None):
+        """Fetch raw SIRI StopMonitoring JSON (every line at the stop if line_ref is None)."""
+        path = f"/api/siri/stop-monitoring.json?key=TEST&MonitoringRef={stop_id}"
+        if line_ref:
+            path += f"&LineRef={urllib.parse.quote(line_ref)}"
+        return self._get_retry(path)
+
+    def vehicle_monitoring(self, line_ref):
+        """Fetch raw SIRI VehicleMonitoring JSON for a line, with each vehicle's onward calls."""
+        path = (
+            f"/api/siri/vehicle-monitoring.json"
+            f"?key=TEST&LineRef={urllib.parse.quote(line_ref)}&VehicleMonitoringDetailLevel=calls"
+        )
+        return self._get_retry(path)
+
+
+def _bus_from_call(journey, call, now_utc):
+    """One bus dict for a vehicle's call at a stop (None if it has no usable time)."""
+    expected_str = call.get("ExpectedArrivalTime") or call.get("AimedArrivalTime")
+    if not expected_str:
+        return None
+
+    try:
+        expected = datetime.fromisoformat(expected_str)
+    except ValueError:
+        return None
+
+    minutes_away = (expected.astimezone(timezone.utc) - now_utc).total_seconds() / 60
+
+    distances = call.get("Extensions", {}).get("Distances", {})
+    progress_status = journey.get("ProgressStatus", "")
+    in_service = not ("prevTrip" in progress_status and "layover" in progress_status)
+
+    return {
+        "vehicle": journey.get("VehicleRef", "unknown"),
+        "line": journey.get("LineRef"),
+        "minutes_away": round(minutes_away, 1),
+        "stops_away": distances.get("StopsFromCall", "?"),
+        "distance_readable": distances.get("PresentableDistance", "?"),
+        "distance_m": distances.get("DistanceFromCall"),
+        "expected_arrival": expected_str,
+        "in_service": in_service,
+        "progress_status": progress_status,
+    }
+
+
+def parse_arrivals(data, now_utc, line_ref=None):
+    """SIRI StopMonitoring JSON → list of bus dicts sorted by arrival time (optionally one line only)."""
+    visits = (
+        data.get("Siri", {})
+        .get("ServiceDelivery", {})
+        .get("StopMonitoringDelivery", [{}])[0]
+        .get("MonitoredStopVisit", [])
+    )
+
+    buses = []
+
+    for visit in visits:
+        journey = visit.get("MonitoredVehicleJourney", {})
+        if line_ref and journey.get("LineRef", line_ref) != line_ref:
+            continue
+        bus = _bus_from_call(journey, journey.get("MonitoredCall", {}), now_utc)
+        if bus:
+            buses.append(bus)
+
+    # Sort by arrival time
+    buses.sort(key=lambda b: b["minutes_away"])
+    return buses
+
+
+def parse_vehicle_calls(data, now_utc, stop_ids):
+    """SIRI VehicleMonitoring JSON (with onward calls) → {stop_id: [bus dicts]} for the given stops."""
+    activity = (
+        data.get("Siri", {})
+        .get("ServiceDelivery", {})
+        .get("VehicleMonitoringDelivery", [{}])[0]
+        .get("VehicleActivity", [])
+    )
+
+    by_stop = {stop_id: [] for stop_id in stop_ids}
+
+    for item in activity:
+        journey = item.get("MonitoredVehicleJourney", {})
+        calls = journey.get("OnwardCalls", {}).get("OnwardCall", [])
+        for call in calls:
+            stop_id = call.get("StopPointRef")
+            if stop_id not in by_stop:
+                continue
+            bus = _bus_from_call(journey, call, now_utc)
+            if bus:
+                by_stop[stop_id].append(bus)
+
+    for buses in by_stop.values():
+        buses.sort(key=lambda b: b["minutes_away"])
+    return by_stop
+
+
+def fetch_watches(client, plan, now_utc):
+    """
+    Run the SIRI calls from plan_fetches(). Returns ({(stop_id, line_ref): buses}, {...: error})
+    plus the earliest SIRI ResponseTimestamp seen; a (stop, line) pair appears in exactly one map.
+    """
+    results, errors, response_at = {}, {}, None
+    for kind, ref, arg in plan:
+        try:
+            if kind == "vehicles":
+                data = client.vehicle_monitoring(ref)
+                for stop_id, buses in parse_vehicle_calls(data, now_utc, arg).items():
+                    results[(stop_id, ref)] = buses
+            else:
+                data = client.stop_monitoring(ref, arg)
+                results[(ref, arg)] = parse_arrivals(data, now_utc, arg)
+            at = response_time(data)
+            if at and (response_at is None or at < response_at):
+                response_at = at
+        except Exception as e:
+            errors[(kind, ref)] = str(e)
+    return results, errors, response_at
+
+
+def buses_for(sub, results):
+    """A subscription's buses from fetch_watches() results (None if its fetch failed)."""
+    if sub.watch in results:
+        return results[sub.watch]
+    # Stop fetched for every line (several lines watched there): filter parsed buses by line
+    for (stop_id, line_ref), buses in results.items():
+        if stop_id == sub.stop_id and line_ref is None:
+            return [b for b in buses if b.get("line") == sub.line_ref]
+    return None
+
+
+def response_time(data):
+    """The SIRI ResponseTimestamp as an aware UTC datetime (None if absent)."""
+    ts = data.get("Siri", {}).get("ServiceDelivery", {}).get("ResponseTimestamp")
+    try:
+        return datetime.fromisoformat(ts).astimezone(timezone.utc)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,88 @@
+"""
+Crash-safe JSON state files for the M57 scripts.
+
+- write_json(): write to a temp file in the same directory, fsync, then
+  os.replace() over the target — readers see the old file or the new one,
+  never a half-written one.
+- read_json(): returns `default` for a missing file, warns (instead of silently
+  treating it as empty) on a corrupt one, and caches parsed contents in memory
+  keyed on inode + mtime + size so a long-running process re-parses only on change.
+- locked(): advisory fcntl lock on a sidecar .lock file for read-modify-write.
+"""
+
+import copy
+import fcntl
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+_cache = {}   # path → ((inode, mtime_ns, size), parsed)
+
+
+def read_json(path, default=None):
+    """Parsed JSON from path, or a copy of default if missing/corrupt."""
+    path = Path(path)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        _cache.pop(path, None)
+        return copy.deepcopy(default)
+
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    cached = _cache.get(path)
+    if cached and cached[0] == key:
+        return copy.deepcopy(cached[1])
+
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        return copy.deepcopy(default)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Unreadable state file {path.name}: {e}", file=sys.stderr)
+        return copy.deepcopy(default)
+    _cache[path] = (key, data)
+    return copy.deepcopy(data)
+
+
+def write_json(path, data, indent=2):
+    """Atomically replace path with data serialized as JSON."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    payload = json.dumps(data, indent=indent)
+    try:
+        with open(tmp, "w") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    _cache.pop(path, None)
+
+
+def remove(path):
+    """Delete a state file if present."""
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    _cache.pop(path, None)
+
+
+@contextmanager
+def locked(path, shared=False):
+    """Hold an advisory lock on path (via path.lock) for a read-modify-write."""
+    path = Path(path)
+    lock_path = path.with_name(path.name + ".lock")
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,145 @@
+"""
+Transit watch subscriptions — who wants alerts for which stop, line and window.
+
+m57-subscriptions.json (optional) is a list of objects; every field except
+"name" falls back to the m57_config defaults:
+
+    [
+      {"name": "jake-am", "stop_id": "MTA_405565", "stop_name": "West End Av / W 61 St",
+       "line_ref": "MTA NYCT_M57", "window": ["06:30", "08:30"], "days": [0, 1, 2, 3, 4],
+       "band": [8, 13], "target": "455383146"}
+    ]
+
+Without the file there is exactly one subscription built from m57_config, so the
+single-commute setup behaves as before. The first subscription is the primary:
+it owns m57-status.json, the history store and the legacy alert-state keys.
+
+plan_fetches() turns the subscriptions into the fewest SIRI calls per tick:
+one VehicleMonitoring call for a line watched at several stops, otherwise one
+StopMonitoring call per distinct stop.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from m57_config import ALERT_MAX, ALERT_MIN, LINE_REF, STOP_ID, STOP_NAME, WINDOW_DAYS, WINDOW_END, WINDOW_START
+from m57_state import read_json
+
+SCRIPTS_DIR = Path(__file__).parent
+SUBSCRIPTIONS_FILE = SCRIPTS_DIR / "m57-subscriptions.json"
+PRIMARY_STATUS_FILE = SCRIPTS_DIR / "m57-status.json"
+
+
+def _hhmm(value):
+    h, m = value.split(":")
+    return (int(h), int(m))
+
+
+class Subscription:
+    """One (stop, line, window, band, target) watch."""
+
+    __slots__ = ("name", "stop_id", "stop_name", "line_ref", "window_start", "window_end",
+                 "window_days", "alert_min", "alert_max", "target", "primary")
+
+    def __init__(self, name, stop_id=STOP_ID, stop_name=None, line_ref=LINE_REF,
+                 window_start=WINDOW_START, window_end=WINDOW_END, window_days=WINDOW_DAYS,
+                 alert_min=ALERT_MIN, alert_max=ALERT_MAX, target=None, primary=False):
+        self.name = name
+        self.stop_id = stop_id
+        self.stop_name = stop_name or (STOP_NAME if stop_id == STOP_ID else stop_id)
+        self.line_ref = line_ref
+        self.window_start = tuple(window_start)
+        self.window_end = tuple(window_end)
+        self.window_days = tuple(window_days)
+        self.alert_min = alert_min
+        self.alert_max = alert_max
+        self.target = target if target is not None else os.environ.get("TELEGRAM_TARGET", "")
+        self.primary = primary
+
+    def __repr__(self):
+        return f"Subscription({self.name!r}, {self.stop_id!r}, {self.line_ref!r})"
+
+    @classmethod
+    def from_dict(cls, d, primary=False):
+        kwargs = {k: d[k] for k in ("stop_id", "stop_name", "line_ref", "target") if k in d}
+        if "window" in d:
+            kwargs["window_start"], kwargs["window_end"] = (_hhmm(t) for t in d["window"])
+        if "days" in d:
+            kwargs["window_days"] = d["days"]
+        if "band" in d:
+            kwargs["alert_min"], kwargs["alert_max"] = d["band"]
+        return cls(d["name"], primary=primary, **kwargs)
+
+    @property
+    def watch(self):
+        return (self.stop_id, self.line_ref)
+
+    @property
+    def status_file(self):
+        if self.primary:
+            return PRIMARY_STATUS_FILE
+        return SCRIPTS_DIR / f"m57-status-{self.name}.json"
+
+    def in_window(self, now_et):
+        t = (now_et.hour, now_et.minute)
+        return now_et.weekday() in self.window_days and self.window_start <= t < self.window_end
+
+    def window_seconds_left(self, now_et):
+        """Seconds of today's window still ahead of now_et (0 on non-window days)."""
+        if now_et.weekday() not in self.window_days:
+            return 0.0
+        start = now_et.replace(hour=self.window_start[0], minute=self.window_start[1], second=0, microsecond=0)
+        end = now_et.replace(hour=self.window_end[0], minute=self.window_end[1], second=0, microsecond=0)
+        return max(0.0, (end - max(start, now_et)).total_seconds())
+
+    def alert_key(self, day, vehicle):
+        """Alert-state key; the primary keeps the original "<day>_<vehicle>" format."""
+        return f"{day}_{vehicle}" if self.primary else f"{day}_{self.name}_{vehicle}"
+
+
+def default_subscription():
+    return Subscription("default", primary=True)
+
+
+def load_subscriptions(path=SUBSCRIPTIONS_FILE):
+    """Subscriptions from path (first one primary), or just the m57_config default."""
+    raw = read_json(path)
+    if not raw:
+        return [default_subscription()]
+    subs, seen = [], set()
+    for i, d in enumerate(raw):
+        try:
+            sub = Subscription.from_dict(d, primary=not subs)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠️  Skipping subscription #{i} in {Path(path).name}: {e!r}", file=sys.stderr)
+            continue
+        if sub.name in seen:
+            print(f"⚠️  Skipping duplicate subscription name {sub.name!r}", file=sys.stderr)
+            continue
+        seen.add(sub.name)
+        subs.append(sub)
+    return subs or [default_subscription()]
+
+
+def plan_fetches(subs):
+    """
+    Minimal SIRI calls covering every subscription's (stop, line) pair:
+      ("vehicles", line_ref, {stop_ids})  one VehicleMonitoring call for a line watched at 2+ stops
+      ("stop", stop_id, line_ref|None)   one StopMonitoring call per remaining stop
+                                         (LineRef omitted when several lines share the stop)
+    """
+    stops_by_line = {}
+    for sub in subs:
+        stops_by_line.setdefault(sub.line_ref, set()).add(sub.stop_id)
+
+    plan = []
+    lines_by_stop = {}
+    for line, stops in sorted(stops_by_line.items()):
+        if len(stops) > 1:
+            plan.append(("vehicles", line, stops))
+        else:
+            lines_by_stop.setdefault(next(iter(stops)), set()).add(line)
+    for stop, lines in sorted(lines_by_stop.items()):
+        plan.append(("stop", stop, next(iter(lines)) if len(lines) == 1 else None))
+    return plan
@@ -0,0 +1,108 @@
+"""
+Trajectory-based ETAs from successive M57 polls.
+
+SIRI reports each bus's DistanceFromCall (metres to our stop) and
+StopsFromCall on every poll. TrajectoryTracker keeps a short in-memory track
+per VehicleRef and from it estimates:
+
+  - moving speed: distance covered ÷ time spent actually moving
+  - dwell per stop: time spent stationary ÷ stops passed (DEFAULT_DWELL until seen)
+
+ETA = distance ÷ moving speed + stops_away × dwell, with a low/high band from
+the spread of the per-interval speeds. Each bus gets trajectory_minutes /
+eta_low / eta_high when there's enough track, and eta_minutes — the trajectory
+figure once its band is narrow enough, otherwise the API's (history-corrected)
+figure — which is what the alerter uses.
+"""
+
+import math
+from collections import deque
+
+MAX_POINTS = 20            # per vehicle
+MAX_AGE = 10 * 60          # seconds of track kept / used
+STALE_AFTER = 10 * 60      # forget a vehicle not seen for this long
+MIN_POINTS = 3
+MIN_SPAN = 90              # seconds of track before estimating
+MOVING_SPEED = 0.5         # m/s; slower than this counts as dwelling
+MIN_SPEED = 1.0            # m/s floor so a stalled bus doesn't give an infinite ETA
+DEFAULT_DWELL = 20.0       # seconds per stop before any dwell is observed
+MAX_BAND = 4.0             # minutes; a band wider than this and than
+BAND_FRACTION = 0.5        #   this fraction of the ETA defers to the API's estimate
+NEW_TRIP_JUMP = 500        # metres; distance growing this much means a new trip
+
+
+class TrajectoryTracker:
+    """Per-vehicle (time, distance, stops) tracks for one stop."""
+
+    def __init__(self):
+        self.tracks = {}   # vehicle → deque[(ts, distance_m, stops)]
+
+    def observe(self, ts, buses):
+        """Record this poll's positions and drop vehicles that have gone stale."""
+        for b in buses:
+            distance = b.get("distance_m")
+            if not isinstance(distance, (int, float)) or not b.get("in_service", True):
+                continue
+            stops = b["stops_away"] if isinstance(b.get("stops_away"), int) else None
+            track = self.tracks.setdefault(b["vehicle"], deque(maxlen=MAX_POINTS))
+            if track and ts <= track[-1][0]:
+                continue
+            if track and distance > track[-1][1] + NEW_TRIP_JUMP:
+                track.clear()
+            track.append((ts, float(distance), stops))
+        for vehicle in [v for v, t in self.tracks.items() if ts - t[-1][0] > STALE_AFTER]:
+            del self.tracks[vehicle]
+
+    def estimate(self, vehicle, now_ts):
+        """(eta_min, low_min, high_min) from the vehicle's track, or None if too little of it."""
+        track = [p for p in self.tracks.get(vehicle, ()) if now_ts - p[0] <= MAX_AGE]
+        if len(track) < MIN_POINTS or track[-1][0] - track[0][0] < MIN_SPAN:
+            return None
+
+        moving_time = dwell_time = moved = 0.0
+        speeds = []
+        for (t0, d0, _), (t1, d1, _) in zip(track, track[1:]):
+            dt, dd = t1 - t0, d0 - d1
+            if dd / dt >= MOVING_SPEED:
+                moving_time += dt
+                moved += dd
+                speeds.append(dd / dt)
+            else:
+                dwell_time += dt
+        if not speeds:
+            return None
+
+        speed = max(MIN_SPEED, moved / moving_time)
+        stops_passed = (track[0][2] - track[-1][2]) if track[0][2] is not None and track[-1][2] is not None else 0
+        dwell = dwell_time / stops_passed if stops_passed > 0 else DEFAULT_DWELL
+
+        ts, distance, stops = track[-1]
+        stops = stops or 0
+        spread = _stdev(speeds) / math.sqrt(len(speeds)) if len(speeds) > 1 else speed / 2
+        fast, slow = speed + 2 * spread, max(MIN_SPEED, speed - 2 * spread)
+
+        elapsed = (now_ts - ts) / 60
+        eta = distance / speed / 60 + stops * dwell / 60 - elapsed
+        low = distance / fast / 60 + stops * dwell * 0.5 / 60 - elapsed
+        high = distance / slow / 60 + stops * dwell * 1.5 / 60 - elapsed
+        return eta, low, high
+
+    def apply(self, buses, now_ts):
+        """Observe buses, then add trajectory_minutes / eta_low / eta_high / eta_minutes to each."""
+        self.observe(now_ts, buses)
+        for b in buses:
+            api = b.get("corrected_minutes_away", b["minutes_away"])
+            b["eta_minutes"] = api
+            est = self.estimate(b["vehicle"], now_ts)
+            if est is None:
+                continue
+            eta, low, high = (round(max(0.0, x), 1) for x in est)
+            b.update(trajectory_minutes=eta, eta_low=low, eta_high=high)
+            if high - low <= max(MAX_BAND, BAND_FRACTION * eta):
+                b["eta_minutes"] = eta
+        return buses
+
+
+def _stdev(values):
+    mean = sum(values) / len(values)
+    return math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Songkick Resolver — finds Songkick venue IDs for venues that don't have one yet,
+so the crawler can use the structured Songkick path instead of [Direct] scraping.
+
+Covers:
+- venues.md entries with no songkick: tag  → ID written back into venues.md
+- accepted discovery candidates             → ID recorded on the candidate record
+                                               (and in venues.md if listed there)
+
+Venues under "### Theater" are skipped: they're scraped directly on purpose,
+and the crawler treats them as theater listings.
+
+For each venue: probe its official page for a songkick.com/venues/<id> link,
+then fall back to Songkick's venue search. A candidate ID is only accepted after
+its calendar page parses as a venue with a matching name in the right city.
+Misses are remembered for RETRY_DAYS so they aren't re-probed every night.
+
+Cron: 30 8 * * * (after discovery at 8am UTC, before html-gen)
+"""
+
+import json
+import re
+import time
+import urllib.parse
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from candidate_store import ACCEPTED, CandidateStore, normalize_key
+from venue_registry import VENUES_FILE, load_venues, set_songkick_id
+from venue_scoring import core_name, fetch_page, json_ld_nodes
+
+STATE_FILE = Path(__file__).parent / "songkick-resolver-state.json"
+ET = ZoneInfo("America/New_York")
+
+RETRY_DAYS = 30
+REQUEST_DELAY = 1.0   # seconds between Songkick requests
+MAX_SEARCH_RESULTS = 5
+THEATER_CATEGORY = "Theater"   # venues.md section whose venues never get a Songkick ID
+
+# venues.md uses full city names, discovery candidates use short ones
+CITY_TERMS = {
+    "new york city": ["new york", "brooklyn", "manhattan", "queens", "nyc"],
+    "nyc":           ["new york", "brooklyn", "manhattan", "queens", "nyc"],
+    "san francisco": ["san francisco", "oakland", "berkeley", "sf"],
+    "sf":            ["san francisco", "oakland", "berkeley", "sf"],
+}
+
+_VENUE_LINK_RE = re.compile(r'songkick\.com/venues/(\d+)(?:-([a-z0-9-]+))?')
+_SEARCH_LINK_RE = re.compile(r'href="/venues/(\d+)-([a-z0-9-]+)"')
+
+
+def load_state():
+    try:
+        return json.loads(STATE_FILE.read_text())
+    except Exception:
+        return {"misses": {}}
+
+
+def save_state(state):
+    STATE_FILE.write_text(json.dumps(state, indent=2, sort_keys=True))
+
+
+def _name_matches(a, b):
+    """True if the core name tokens of one name are all contained in the other."""
+    ta, tb = set(core_name(a).split()), set(core_name(b).split())
+    return bool(ta and tb) and (ta <= tb or tb <= ta)
+
+
+def _slug_matches(slug, name):
+    return _name_matches(slug.replace("-", " "), name)
+
+
+def probe_official_page(url):
+    """Songkick venue IDs linked from the venue's own site."""
+    if not url:
+        return []
+    html = fetch_page(url) or ""
+    return list(dict.fromkeys(m.group(1) for m in _VENUE_LINK_RE.finditer(html)))
+
+
+def search_songkick(name, city):
+    """Songkick venue search → candidate IDs whose slug matches the venue name."""
+    query = urllib.parse.urlencode({"query": name, "type": "venues"})
+    html = fetch_page(f"https://www.songkick.com/search?{query}") or ""
+    ids = []
+    for m in _SEARCH_LINK_RE.finditer(html):
+        songkick_id, slug = m.group(1), m.group(2)
+        if songkick_id not in ids and _slug_matches(slug, name):
+            ids.append(songkick_id)
+        if len(ids) >= MAX_SEARCH_RESULTS:
+            break
+    return ids
+
+
+def validate(songkick_id, name, city):
+    """
+    Fetch the venue's calendar page and confirm it describes this venue:
+    a JSON-LD place whose name matches and whose address is in the right city.
+    """
+    html = fetch_page(f"https://www.songkick.com/venues/{songkick_id}/calendar")
+    if not html:
+        return False
+    city_terms = CITY_TERMS.get(city.lower(), [city.lower()])
+    for node in json_ld_nodes(html):
+        places = [node]
+        if isinstance(node.get("location"), dict):
+            places.append(node["location"])
+        for place in places:
+            place_name = place.get("name")
+            if not isinstance(place_name, str) or not _name_matches(place_name, name):
+                continue
+            address = json.dumps(place.get("address", "")).lower()
+            if any(t in address for t in city_terms):
+                return True
+    return False
+
+
+def resolve(name, city, official_url):
+    """Return a validated Songkick ID for the venue, or None."""
+    tried = set()
+    for source, finder in (("site", lambda: probe_official_page(official_url)),
+                           ("search", lambda: search_songkick(name, city))):
+        for songkick_id in finder():
+            if songkick_id in tried:
+                continue
+            tried.add(songkick_id)
+            time.sleep(REQUEST_DELAY)
+            if validate(songkick_id, name, city):
+                print(f"     ✅ songkick:{songkick_id} (via {source})")
+                return songkick_id
+        time.sleep(REQUEST_DELAY)
+    return None
+
+
+def _due(state, key):
+    checked = state["misses"].get(key)
+    return not checked or time.time() - checked > RETRY_DAYS * 86400
+
+
+def _same_city(a, b):
+    """"NYC" (discovery) and "New York City" (venues.md) are the same city."""
+    return CITY_TERMS.get(a.lower(), [a.lower()]) == CITY_TERMS.get(b.lower(), [b.lower()])
+
+
+def _listed_entry(listed, rec):
+    """The venues.md entry for an accepted candidate, if it has been added there."""
+    return next((v for v in listed if normalize_key(v.name) == rec["key"] and _same_city(v.city, rec["city"])), None)
+
+
+def main():
+    print(f"\n🎫 Songkick Resolver — {datetime.now(ET).strftime('%Y-%m-%d %H:%M %Z')}")
+    state = load_state()
+    store = CandidateStore.load()
+    resolved = 0
+
+    # 1. venues.md music entries without an ID (theater venues stay on the direct path)
+    listed = load_venues(VENUES_FILE)
+    theater = {normalize_key(v.name) for v in listed if v.category == THEATER_CATEGORY}
+    venues = [v for v in listed if not v.songkick_id and normalize_key(v.name) not in theater]
+    print(f"  {len(venues)} venue(s) in venues.md without a Songkick ID")
+    for v in venues:
+        key = normalize_key(v.name)
+        if not _due(state, key):
+            continue
+        print(f"  🔎 {v.name} ({v.city})")
+        songkick_id = resolve(v.name, v.city, v.url)
+        if songkick_id and set_songkick_id(v.city, v.name, songkick_id, VENUES_FILE):
+            state["misses"].pop(key, None)
+            rec = store.get(v.name)
+            if rec:
+                rec["songkick_id"] = songkick_id
+            resolved += 1
+        else:
+            state["misses"][key] = time.time()
+
+    # 2. accepted discovery candidates not yet carrying an ID
+    candidates = [r for r in store.with_status(ACCEPTED) if not r.get("songkick_id")]
+    for rec in candidates:
+        if rec["key"] in theater or not _due(state, rec["key"]):
+            continue
+        print(f"  🔎 {rec['name']} ({rec['city']}) [candidate]")
+        songkick_id = resolve(rec["name"], rec["city"], rec.get("url", ""))
+        if songkick_id:
+            rec["songkick_id"] = songkick_id
+            entry = _listed_entry(listed, rec)
+            if entry:
+                set_songkick_id(entry.city, entry.name, songkick_id, VENUES_FILE)
+            state["misses"].pop(rec["key"], None)
+            resolved += 1
+        else:
+            state["misses"][rec["key"]] = time.time()
+
+    store.save()
+    save_state(state)
+    print(f"\n✅ Resolver done — {resolved} Songkick ID(s) found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Replays the recorded SIRI responses in fixtures/m57-siri through the M57
+parse + alert pipeline (m57-replay.py run()).
+
+The recording is a Monday morning, one poll every 2 minutes from 07:00 ET:
+  MTA NYCT_7101  approaching steadily, arrives 07:20 — due one alert, at 07:08
+                 (12 min out, the first poll inside the 8–13 min band)
+  MTA NYCT_7202  always 25 min away — never in the band
+  MTA NYCT_7303  10 min away but on layover — never alerted
+
+Run from users/jake/scripts:  python3 -m unittest discover -s tests
+"""
+
+import copy
+import importlib.util
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "m57-siri"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import m57_history  # noqa: E402
+from m57_config import ET, STOP_ID  # noqa: E402
+from m57_subscriptions import default_subscription  # noqa: E402
+
+
+def load_script(name):
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class ReplayAlertTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        # No history bias and no local m57-subscriptions.json: the fixture is for the default commute
+        self._rollup = m57_history.ROLLUP_FILE
+        m57_history.ROLLUP_FILE = self.tmp / "rollup.json"
+        self.addCleanup(setattr, m57_history, "ROLLUP_FILE", self._rollup)
+        self.replayer = load_script("m57-replay")
+        self.replayer.load_subscriptions = lambda: [default_subscription()]
+
+    def replay(self, paths, **kwargs):
+        alerts = self.replayer.run(self.replayer.load_recordings([str(p) for p in paths]), **kwargs)
+        return [(at.astimezone(ET).strftime("%H:%M:%S"), vehicle) for at, vehicle in alerts]
+
+    def test_alert_fires_once_inside_band(self):
+        sent = self.replay(sorted(FIXTURES.glob("*.json")))
+        self.assertEqual(sent, [("07:08:00", "MTA NYCT_7101")])
+
+    def test_silent_before_band(self):
+        early = sorted(FIXTURES.glob("*.json"))[:4]    # 07:00–07:06: 20 → 14 min out
+        self.assertEqual(self.replay(early), [])
+
+    def test_silent_outside_window(self):
+        # Same morning two hours later (09:00–09:18 ET), after the 06:30–08:30 window
+        for path in FIXTURES.glob("*.json"):
+            (self.tmp / path.name).write_text(path.read_text().replace("T07:", "T09:"))
+        paths = sorted(self.tmp.glob("2026*.json"))
+        self.assertEqual(self.replay(paths), [])
+
+    def test_vehicle_monitoring_over_http(self):
+        # The same morning as VehicleMonitoring responses, fetched through the stub server
+        for path in FIXTURES.glob("*.json"):
+            (self.tmp / path.name).write_text(json.dumps(as_vehicle_monitoring(json.loads(path.read_text()))))
+        sent = self.replay(sorted(self.tmp.glob("2026*.json")), use_http=True)
+        self.assertEqual(sent, [("07:08:00", "MTA NYCT_7101")])
+
+
+def as_vehicle_monitoring(data):
+    """A StopMonitoring response rewritten as VehicleMonitoring, each visit an onward call at STOP_ID."""
+    delivery = data["Siri"]["ServiceDelivery"]
+    activity = []
+    for visit in delivery.pop("StopMonitoringDelivery")[0]["MonitoredStopVisit"]:
+        journey = copy.deepcopy(visit["MonitoredVehicleJourney"])
+        call = journey.pop("MonitoredCall")
+        journey["OnwardCalls"] = {"OnwardCall": [{**call, "StopPointRef": STOP_ID}]}
+        activity.append({"MonitoredVehicleJourney": journey})
+    delivery["VehicleMonitoringDelivery"] = [{"VehicleActivity": activity}]
+    return data
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+The poller daemon's alert check when the SIRI call fails: the static-schedule
+fallback from m57-schedule.idx must still raise the alert.
+
+Run from users/jake/scripts:  python3 -m unittest discover -s tests
+"""
+
+import importlib.util
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import m57_alerting  # noqa: E402
+import m57_schedule  # noqa: E402
+import m57_subscriptions  # noqa: E402
+from m57_config import ET, LINE_REF, STOP_ID  # noqa: E402
+from m57_notify import Notifier, StubBackend  # noqa: E402
+from m57_subscriptions import default_subscription  # noqa: E402
+
+NOW_ET = datetime(2026, 3, 2, 7, 0, tzinfo=ET)   # Monday, inside the 06:30–08:30 window
+
+
+def load_script(name):
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW_ET.astimezone(tz)
+
+
+class DownClient:
+    """SiriClient stand-in whose every call fails."""
+
+    def stop_monitoring(self, stop_id, line_ref=None):
+        raise ConnectionError("SIRI unreachable")
+
+    def vehicle_monitoring(self, line_ref):
+        raise ConnectionError("SIRI unreachable")
+
+
+class ScheduleFallbackTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        # Keep every state file the tick touches out of the scripts directory
+        for module, attr in ((m57_alerting, "ALERT_STATE_FILE"), (m57_alerting, "MUTE_FILE"),
+                             (m57_alerting, "LAST_MESSAGE_FILE"), (m57_subscriptions, "PRIMARY_STATUS_FILE"),
+                             (m57_schedule, "SCHEDULE_FILE")):
+            self.addCleanup(setattr, module, attr, getattr(module, attr))
+            setattr(module, attr, self.tmp / Path(getattr(module, attr)).name)
+        m57_schedule._index = m57_schedule._index_version = None
+
+        self.backend = StubBackend()
+        self.addCleanup(setattr, m57_alerting, "notifier", m57_alerting.notifier)
+        m57_alerting.notifier = Notifier(backend=self.backend, on_sent=m57_alerting._record_sent)
+
+        self.poll = load_script("m57-poll")
+        self.poll.datetime = FixedDatetime
+
+    def tick(self):
+        """One daemon tick (poll, then alert check) with SIRI down."""
+        polled = self.poll.poll_once(DownClient(), [default_subscription()])
+        self.poll.check_alerts(polled, NOW_ET)
+        m57_alerting.notifier.flush()
+        return polled
+
+    def test_scheduled_bus_alerts_when_siri_fails(self):
+        # Departures at 07:10 (10 min out — inside the 8–13 min band) and 07:30
+        m57_schedule.write_index(m57_schedule.SCHEDULE_FILE,
+                                 {(STOP_ID, LINE_REF): {20260302: [7 * 3600 + 600, 7 * 3600 + 1800]}})
+        (_, status), = self.tick()
+        self.assertTrue(status["error"])
+        self.assertEqual(len(self.backend.sent), 1)
+        self.assertIn("schedule — live tracking is down", self.backend.sent[0][0])
+        self.assertIn("7:10 AM", self.backend.sent[0][0])
+
+    def test_no_alert_without_schedule_index(self):
+        (_, status), = self.tick()
+        self.assertEqual(status["schedule_fallback"], [])
+        self.assertEqual(self.backend.sent, [])
+
+    def test_unreadable_index_is_skipped(self):
+        for content in (b"", b"M57SCHD1\x05", b"NOTANIDX" + bytes(64)):
+            with self.subTest(content=content):
+                m57_schedule.SCHEDULE_FILE.write_bytes(content)
+                m57_schedule._index_version = None
+                (_, status), = self.tick()
+                self.assertEqual(status["schedule_fallback"], [])
+        self.assertEqual(self.backend.sent, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
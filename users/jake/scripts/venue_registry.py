@@ -0,0 +1,150 @@
+"""
+Venue registry — single loader for events/venues.md, shared by the crawler,
+the discovery run and the HTML generator.
+
+venues.md format:
+    ## City
+    ### Category
+    - **Name** | https://official/url | songkick:1234 | hood:Area/Neighborhood
+
+The parsed record list is memoized to a small pickle next to this module,
+keyed on venues.md's mtime + size, so repeated loads skip the regex parse.
+"""
+
+import pickle
+import re
+from collections import defaultdict
+from pathlib import Path
+
+WORKSPACE   = Path(__file__).parent.parent
+VENUES_FILE = WORKSPACE / "events/venues.md"
+CACHE_FILE  = Path(__file__).parent / ".venue-registry.cache"
+
+CACHE_VERSION = 1
+
+_NAME_RE     = re.compile(r'- \*\*(.+?)\*\*')
+_SONGKICK_RE = re.compile(r'songkick:(\d+)')
+_HOOD_RE     = re.compile(r'hood:(.+)')
+
+
+class Venue:
+    """One venue line from venues.md."""
+    __slots__ = ("name", "city", "category", "url", "songkick_id", "neighborhood")
+
+    def __init__(self, name, city, category="", url="", songkick_id=None, neighborhood=None):
+        self.name = name
+        self.city = city
+        self.category = category
+        self.url = url
+        self.songkick_id = songkick_id
+        self.neighborhood = neighborhood
+
+    def __getstate__(self):
+        return tuple(getattr(self, s) for s in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+    def __repr__(self):
+        return f"Venue({self.name!r}, {self.city!r}, songkick_id={self.songkick_id!r})"
+
+
+def parse_venues_md(text):
+    """Parse venues.md text → [Venue, ...] in file order."""
+    venues = []
+    current_city = None
+    current_category = ""
+    for line in text.splitlines():
+        if line.startswith("## "):
+            current_city = line[3:].strip()
+            current_category = ""
+        elif line.startswith("### "):
+            current_category = line[4:].strip()
+        elif line.startswith("- **") and current_city:
+            parts = [p.strip() for p in line.split("|")]
+            m = _NAME_RE.match(parts[0])
+            if not m:
+                continue
+            songkick_id = None
+            neighborhood = None
+            for part in parts[2:]:
+                sk = _SONGKICK_RE.match(part)
+                if sk:
+                    songkick_id = sk.group(1)
+                hood = _HOOD_RE.match(part)
+                if hood:
+                    neighborhood = hood.group(1)
+            venues.append(Venue(
+                name=m.group(1),
+                city=current_city,
+                category=current_category,
+                url=parts[1] if len(parts) > 1 else "",
+                songkick_id=songkick_id,
+                neighborhood=neighborhood,
+            ))
+    return venues
+
+
+def _cache_key(path):
+    st = path.stat()
+    return (CACHE_VERSION, str(path.resolve()), st.st_mtime_ns, st.st_size)
+
+
+def load_venues(path=VENUES_FILE):
+    """
+    Return [Venue, ...] for venues.md, using the on-disk cache when venues.md
+    hasn't changed since it was written. Cache problems just fall back to a parse.
+    """
+    path = Path(path)
+    key = _cache_key(path)
+    try:
+        with open(CACHE_FILE, "rb") as f:
+            cached_key, venues = pickle.load(f)
+        if cached_key == key:
+            return venues
+    except Exception:
+        pass
+
+    venues = parse_venues_md(path.read_text())
+    try:
+        tmp = CACHE_FILE.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump((key, venues), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(CACHE_FILE)
+    except OSError as e:
+        print(f"  ⚠️  Could not write venue cache: {e}")
+    return venues
+
+
+def set_songkick_id(city, name, songkick_id, path=VENUES_FILE):
+    """
+    Write a songkick:<id> tag onto the venue's line under its city in venues.md
+    (placed after the URL). Returns True if the line was updated.
+    """
+    path = Path(path)
+    lines = path.read_text().splitlines(keepends=True)
+    current_city = None
+    for i, line in enumerate(lines):
+        if line.startswith("## "):
+            current_city = line[3:].strip()
+        m = _NAME_RE.match(line)
+        if not m or m.group(1) != name or current_city != city:
+            continue
+        parts = [p.strip() for p in line.rstrip("\n").split("|")]
+        parts = [p for p in parts if not _SONGKICK_RE.match(p)]
+        parts.insert(min(2, len(parts)), f"songkick:{songkick_id}")
+        lines[i] = " | ".join(parts) + ("\n" if line.endswith("\n") else "")
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text("".join(lines))
+        tmp.replace(path)
+        return True
+    return False
+
+
+def venues_by_city(venues):
+    """Group [Venue, ...] → {city: [Venue, ...]} preserving file order."""
+    grouped = defaultdict(list)
+    for v in venues:
+        grouped[v.city].append(v)
+    return grouped
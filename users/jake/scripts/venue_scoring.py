@@ -0,0 +1,228 @@
+"""
+Venue scoring — turns raw discovery search hits into deduplicated, scored
+venue candidates before anything reaches candidates.md.
+
+1. Cluster: hits are grouped by registered domain (one site = one venue), then
+   clusters whose core names match ("Nublu", "Nublu NYC | Official Site") merge.
+2. Score: each cluster's URL is fetched once and checked for schema.org
+   MusicVenue / EventVenue / PerformingArtsTheater JSON-LD. Listicle titles,
+   article markup and ticketing/aggregator domains count against it.
+"""
+
+import json
+import re
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from candidate_store import normalize_key
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+FETCH_WORKERS = 6
+FETCH_MAX_BYTES = 512 * 1024   # JSON-LD lives in <head>; no need for the whole page
+MIN_SCORE = 2
+
+VENUE_TYPES   = {"MusicVenue", "EventVenue", "PerformingArtsTheater"}
+EVENT_TYPES   = {"Event", "MusicEvent", "TheaterEvent", "ComedyEvent", "DanceEvent"}
+ARTICLE_TYPES = {"Article", "NewsArticle", "BlogPosting", "ItemList", "CollectionPage"}
+
+# Sites that list many venues/events — never a venue's own site
+AGGREGATOR_DOMAINS = {
+    "ticketmaster.com", "livenation.com", "eventbrite.com", "songkick.com",
+    "bandsintown.com", "seatgeek.com", "stubhub.com", "vividseats.com", "dice.fm",
+    "axs.com", "timeout.com", "yelp.com", "tripadvisor.com", "reddit.com",
+    "wikipedia.org", "theskint.com", "secretnyc.co", "secretsanfrancisco.com",
+    "nycgo.com", "sftravel.com", "broadwayworld.com", "playbill.com",
+    "nytimes.com", "sfchronicle.com", "sfgate.com", "villagevoice.com",
+    "instagram.com", "facebook.com", "x.com", "twitter.com", "tiktok.com",
+}
+
+# Two-label public suffixes seen in practice (stdlib has no public suffix list)
+_SECOND_LEVEL = {"co.uk", "org.uk", "ac.uk", "com.au", "co.nz", "co.jp", "com.br", "com.mx"}
+
+_LISTICLE_RE = re.compile(
+    r'\b(best|top \d+|\d+ (?:best|great|top)|guide to|things to do|list of|'
+    r'where to|ranked|roundup)\b', re.IGNORECASE)
+_LD_RE = re.compile(
+    r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE)
+# Words that don't distinguish one venue from another, dropped wherever they appear in a name
+_NAME_NOISE_RE = re.compile(
+    r'\b(nyc|new york( city)?|brooklyn|manhattan|sf|san francisco|bay area|oakland|'
+    r'official( site| website)?|home|events?|tickets?|calendar|shows?|live music)\b')
+
+
+def registered_domain(url):
+    """'https://www.tickets.elsewhere.co.uk/x' → 'elsewhere.co.uk'"""
+    try:
+        host = urllib.parse.urlparse(url).hostname or ""
+    except ValueError:
+        return ""
+    labels = host.lower().strip(".").split(".")
+    if len(labels) >= 3 and ".".join(labels[-2:]) in _SECOND_LEVEL:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def core_name(name):
+    """Name key with city/boilerplate words dropped, for clustering title variants."""
+    key = _NAME_NOISE_RE.sub(" ", normalize_key(name))
+    return re.sub(r'\s+', ' ', key).strip() or normalize_key(name)
+
+
+def fetch_page(url, timeout=12):
+    """Fetch the head of a page; returns text or None on error."""
+    try:
+        req = urllib.request.Request(url, headers=HEADERS)
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            raw = resp.read(FETCH_MAX_BYTES)
+            enc = resp.headers.get_content_charset() or "utf-8"
+            return raw.decode(enc, errors="replace")
+    except Exception as e:
+        print(f"     ⚠️  fetch {url[:60]}: {e}")
+        return None
+
+
+def json_ld_nodes(html):
+    """All JSON-LD objects on a page, with @graph containers and lists flattened."""
+    nodes = []
+    for m in _LD_RE.finditer(html or ""):
+        try:
+            data = json.loads(m.group(1).strip())
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                nodes.append(item)
+                if "@graph" in item:
+                    stack.append(item["@graph"])
+    return nodes
+
+
+def _types(node):
+    t = node.get("@type", [])
+    return {x for x in (t if isinstance(t, list) else [t]) if isinstance(x, str)}
+
+
+class VenueCluster:
+    """All search hits believed to be the same venue."""
+    __slots__ = ("city", "domain", "names", "hits", "score", "reasons", "ld_name")
+
+    def __init__(self, city, domain):
+        self.city = city
+        self.domain = domain
+        self.names = []      # extracted title variants, first-seen order
+        self.hits = []       # (query, result) pairs
+        self.score = 0
+        self.reasons = []
+        self.ld_name = None
+
+    @property
+    def url(self):
+        return self.hits[0][1]["url"]
+
+    @property
+    def query(self):
+        return self.hits[0][0]
+
+    @property
+    def description(self):
+        return max((r["description"] for _, r in self.hits), key=len, default="")
+
+    @property
+    def name(self):
+        """schema.org name if the page declared one, else the shortest title variant."""
+        return self.ld_name or min(self.names, key=len)
+
+    def merge(self, other):
+        self.names += [n for n in other.names if n not in self.names]
+        self.hits += other.hits
+
+
+def cluster_hits(hits, extract_name):
+    """
+    hits: [(city, query, result), ...] that passed the keyword pre-filter.
+    Returns [VenueCluster, ...] in first-seen order.
+    """
+    by_domain = {}
+    for city, query, result in hits:
+        name = extract_name(result)
+        domain = registered_domain(result["url"])
+        if not name or not domain:
+            continue
+        cluster = by_domain.get(domain)
+        if cluster is None:
+            cluster = by_domain[domain] = VenueCluster(city, domain)
+        if name not in cluster.names:
+            cluster.names.append(name)
+        cluster.hits.append((query, result))
+
+    merged = {}
+    for cluster in by_domain.values():
+        if cluster.domain in AGGREGATOR_DOMAINS:
+            key = (cluster.city, cluster.domain)
+        else:
+            key = (cluster.city, core_name(min(cluster.names, key=len)))
+        if key in merged:
+            merged[key].merge(cluster)
+        else:
+            merged[key] = cluster
+    return list(merged.values())
+
+
+def score_cluster(cluster, html):
+    """Set cluster.score / reasons / ld_name from its fetched page and search hits."""
+    score, reasons = 1, ["keyword match"]
+    title = " ".join(r["title"] for _, r in cluster.hits)
+
+    if cluster.domain in AGGREGATOR_DOMAINS:
+        score -= 4
+        reasons.append(f"aggregator domain {cluster.domain}")
+    if _LISTICLE_RE.search(title):
+        score -= 3
+        reasons.append("listicle title")
+
+    name_words = [w for w in core_name(cluster.names[0]).split() if len(w) > 2]
+    if name_words and any(w in cluster.domain for w in name_words):
+        score += 1
+        reasons.append("name in domain")
+
+    nodes = json_ld_nodes(html)
+    venue = next((n for n in nodes if _types(n) & VENUE_TYPES), None)
+    if venue:
+        score += 4
+        reasons.append("schema.org " + "/".join(sorted(_types(venue) & VENUE_TYPES)))
+        if isinstance(venue.get("name"), str) and venue["name"].strip():
+            cluster.ld_name = venue["name"].strip()[:60]
+    if any(_types(n) & EVENT_TYPES for n in nodes):
+        score += 1
+        reasons.append("event listings")
+    if any(_types(n) & ARTICLE_TYPES for n in nodes):
+        score -= 2
+        reasons.append("article markup")
+
+    cluster.score = score
+    cluster.reasons = reasons
+    return cluster
+
+
+def score_clusters(clusters):
+    """Fetch every cluster's URL once (concurrently) and score it. Aggregators aren't fetched."""
+    def fetch(cluster):
+        return None if cluster.domain in AGGREGATOR_DOMAINS else fetch_page(cluster.url)
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        pages = list(pool.map(fetch, clusters))
+    for cluster, html in zip(clusters, pages):
+        score_cluster(cluster, html)
+    return clusters
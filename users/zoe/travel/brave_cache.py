@@ -0,0 +1,84 @@
+"""
+brave_cache.py — On-disk cache of Brave Search responses for travel-scout.py.
+
+Entries are keyed by the normalized request (query lowercased with whitespace
+collapsed, plus count and the other API params) and expire after a TTL chosen
+per call, so listicle searches can refresh more often than per-venue lookups.
+Only successful responses are cached.
+
+The whole cache is one JSON file, loaded once per run and written back
+atomically at the end (expired entries dropped).
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+CACHE_FILE = Path(__file__).parent / ".brave-cache.json"
+MAX_TTL = 90 * 86400   # entries older than this are dropped on save
+
+
+def cache_key(query: str, count: int, params: dict) -> str:
+    norm = re.sub(r"\s+", " ", query.strip().lower())
+    return json.dumps([norm, count, sorted(params.items())], ensure_ascii=False)
+
+
+class BraveCache:
+    """Thread-safe query → results cache with hit/miss counters."""
+
+    def __init__(self, path: Path = CACHE_FILE):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.fresh_after = 0.0
+        self.ttl_override: float | None = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def load(self, refresh: bool = False, ttl_days: float | None = None):
+        """Read the cache file. refresh=True ignores entries from earlier runs (new ones are still stored)."""
+        self.fresh_after = time.time() if refresh else 0.0
+        self.ttl_override = ttl_days * 86400 if ttl_days is not None else None
+        try:
+            self.entries = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            print(f"  [warn] Ignoring unreadable search cache {self.path.name}: {e}")
+            self.entries = {}
+
+    def get(self, key: str, ttl: float) -> list[dict] | None:
+        ttl = self.ttl_override if self.ttl_override is not None else ttl
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and entry["at"] >= self.fresh_after and time.time() - entry["at"] < ttl:
+                self.hits += 1
+                return entry["results"]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, results: list[dict]):
+        with self._lock:
+            self.entries[key] = {"at": time.time(), "results": results}
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        cutoff = time.time() - MAX_TTL
+        with self._lock:
+            keep = {k: v for k, v in self.entries.items() if v["at"] >= cutoff}
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(keep, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.path)
+            self._dirty = False
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = f"{100 * self.hits / total:.0f}%" if total else "n/a"
+        return (f"Brave cache: {self.hits} hit(s), {self.misses} miss(es) ({rate} hit rate) — "
+                f"{self.hits} API call(s) saved")
@@ -0,0 +1,32 @@
+"""
+keyword_trie.py — Many-keyword regexes for travel-scout's text matching.
+
+trie_pattern() turns a set of literal phrases into one regex alternation
+factored as a prefix trie, e.g. {"bar", "bao", "dishoom"} →
+"(?:ba(?:o|r)|dishoom)". The regex engine then walks the trie once per
+text position in C, instead of trying every phrase in turn, so adding
+phrases barely changes the cost of a search. Used by noise_rules.py and
+venue_tagger.py.
+"""
+
+import re
+
+
+def trie_pattern(phrases) -> str:
+    """Non-capturing regex matching any of phrases, longest first at each position."""
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if "" in node:
+            return "(?:" + "|".join(branches) + ")?"
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return "(?:" + build(trie) + ")"
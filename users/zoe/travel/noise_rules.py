@@ -0,0 +1,122 @@
+"""
+noise_rules.py — Rule-based noise filter for venue names pulled out of listicles.
+
+Rules live in noise-rules.json, each with an ID:
+  "exact":    [{"id", "names": [...]}]   whole-name matches (lowercased)
+  "patterns": [{"id", "pattern"}]        regexes searched in the lowercased name
+plus one built-in rule, "all-caps-label", for long all-caps UI labels
+("THE SPOTS"). Optional "note" fields are for people reading the file.
+
+Everything is compiled once. The exact names become one dict. The patterns
+become one combined regex of named groups (split into a ^-anchored half
+tried only at the start and a floating half), so the group that matched
+names the rule. Patterns that are plain phrases, optionally wrapped in
+^ / \b / $, are merged into a prefix trie inside that regex, and the
+matched text maps back to the rule. Checking a name is a dict lookup plus
+at most two regex calls, and adding phrase rules (the usual per-publisher
+case) barely changes that cost. Patterns must not use numbered groups or
+backreferences.
+
+Each decision is counted against its rule ID, and unused() lists the rules
+that never fired.
+"""
+
+import json
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+
+from keyword_trie import trie_pattern
+
+RULES_FILE = Path(__file__).parent / "noise-rules.json"
+ALL_CAPS_RULE = "all-caps-label"
+
+
+class NoiseFilter:
+    """Compiled noise rules with per-rule hit counters (thread-safe)."""
+
+    def __init__(self, path: Path = RULES_FILE):
+        rules = json.loads(Path(path).read_text())
+        self.rule_ids: list[str] = []
+        self.exact: dict[str, str] = {}
+        for rule in rules.get("exact", []):
+            self._add_id(rule["id"])
+            for name in rule["names"]:
+                self.exact.setdefault(name.lower(), rule["id"])
+
+        literals: dict[tuple[str, str], dict[str, str]] = {}   # (lead, trail) → {phrase: rule id}
+        anchored, floating = [], []
+        self._group_ids: dict[str, str] = {}
+        for n, rule in enumerate(rules.get("patterns", [])):
+            self._add_id(rule["id"])
+            pattern = rule["pattern"]
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"{Path(path).name}: bad pattern for rule {rule['id']!r}: {e}") from None
+            lead, phrase, trail = _split_literal(pattern)
+            if phrase is not None:
+                literals.setdefault((lead, trail), {}).setdefault(phrase.lower(), rule["id"])
+                continue
+            self._group_ids[f"r{n}"] = rule["id"]
+            (anchored if pattern.startswith("^") else floating).append(f"(?P<r{n}>{pattern})")
+        self._add_id(ALL_CAPS_RULE)
+
+        self._literal_ids: dict[str, dict[str, str]] = {}
+        for k, ((lead, trail), phrases) in enumerate(sorted(literals.items())):
+            group = f"l{k}"
+            self._literal_ids[group] = phrases
+            (anchored if lead == "^" else floating).append(f"(?P<{group}>{lead}{trie_pattern(phrases)}{trail})")
+        self.anchored = re.compile("|".join(anchored), re.IGNORECASE) if anchored else None
+        self.floating = re.compile("|".join(floating), re.IGNORECASE) if floating else None
+        self.hits: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def _add_id(self, rule_id: str):
+        if rule_id in self.rule_ids:
+            raise ValueError(f"duplicate noise rule id {rule_id!r}")
+        self.rule_ids.append(rule_id)
+
+    def match(self, name: str) -> str | None:
+        """ID of the rule that marks name as noise (counted), or None if it looks like a venue."""
+        key = name.lower().strip()
+        rule = self.exact.get(key)
+        if rule is None:
+            m = (self.anchored and self.anchored.match(key)) or (self.floating and self.floating.search(key))
+            if m:
+                group = m.lastgroup
+                rule = self._literal_ids[group][m.group().lower()] if group[0] == "l" else self._group_ids[group]
+        if rule is None and name.isupper() and len(name) > 5:
+            rule = ALL_CAPS_RULE
+        if rule is not None:
+            with self._lock:
+                self.hits[rule] += 1
+        return rule
+
+    def unused(self) -> list[str]:
+        """Rule IDs with no hits so far, in file order."""
+        return [r for r in self.rule_ids if not self.hits[r]]
+
+    def summary(self) -> str:
+        top = ", ".join(f"{r} {n}" for r, n in self.hits.most_common(5))
+        unused = self.unused()
+        return (f"Noise rules: {sum(self.hits.values())} name(s) filtered" + (f" (top: {top})" if top else "")
+                + f"; {len(unused)}/{len(self.rule_ids)} rule(s) unused this run"
+                + (f": {', '.join(unused)}" if unused else ""))
+
+
+_LEADS = ("^", r"\b")
+_TRAILS = (r"\b", "$")
+_META = set(".^$*+?{}[]|()\\")
+
+
+def _split_literal(pattern: str) -> tuple[str, str | None, str]:
+    """(lead, phrase, trail) if pattern is a plain phrase with optional ^ / \\b / $ ends, else phrase None."""
+    lead = next((t for t in _LEADS if pattern.startswith(t)), "")
+    body = pattern[len(lead):]
+    trail = next((t for t in _TRAILS if body.endswith(t) and not body.endswith("\\" + t)), "")
+    body = body[:len(body) - len(trail)]
+    if not body or any(c in _META for c in body):
+        return lead, None, trail
+    return lead, body, trail
@@ -4,11 +4,31 @@ travel-scout.py — Discover top restaurants, bars, and highlights for upcoming
 
 Two-pass approach:
   Pass 1: Brave Search → curated listicle articles (Eater, Infatuation, Michelin, Timeout, etc.)
-  Pass 2: Fetch those articles → extract actual venue names → search each venue for
-          its direct website + reservation link (Resy, OpenTable, Tock, etc.)
+  Pass 2: Fetch those articles → extract actual venue names, and the website /
+          reservation links (Resy, OpenTable, Tock, etc.) the article gives next to
+          each one → merge name variants across articles and rank the venues by
+          independent sources, list position and rating (venue_resolve.py) →
+          search only for top-ranked venues the articles didn't link
+
+Cities, categories, article fetches and per-venue lookups run concurrently;
+every Brave call goes through one shared rate limiter, and results are always
+consumed in submission order so the output doesn't depend on timing.
+
+Brave responses are cached on disk (brave_cache.py): listicle searches for
+ARTICLE_CACHE_TTL, venue lookups for VENUE_CACHE_TTL. Re-running a trip, or a
+later trip to the same city, mostly costs no quota.
+
+Every enriched or rejected venue goes into the per-city, per-category
+knowledge base venues.db (venue_kb.py). Later scouts reuse venues enriched in the last
+STALE_DAYS. A scout writes each trip's venues.json / venues.md / candidates.md
+from its own ranked results; --fill-from-kb pads short lists with venues from
+earlier scouts, and --from-kb rewrites the files from the KB alone. Either way
+venues the latest scout didn't mention are marked "carried_over".
 
 Usage:
-    python3 travel-scout.py [trip-id]
+    python3 travel-scout.py [trip-id] [--refresh] [--cache-ttl DAYS] [--fill-from-kb]
+    python3 travel-scout.py [trip-id] --from-kb                # rewrite trip files from venues.db only
+    python3 travel-scout.py --extract saved-article.html ...   # offline: names, links, parse time
 
 Requires:
     BRAVE_API_KEY environment variable
@@ -18,17 +38,38 @@ import os
 import sys
 import re
 import json
+import argparse
+import bisect
 import time
 import gzip
 import datetime
+import functools
+import threading
 import urllib.request
 import urllib.parse
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 from pathlib import Path
 
+from brave_cache import BraveCache, cache_key
+from noise_rules import NoiseFilter
+from venue_kb import VenueKB
+from venue_resolve import VenueCluster, resolve_venues
+from venue_tagger import VenueTagger
+
 TRIPS_FILE = Path(__file__).parent / "trips.json"
 BRAVE_API_URL = "https://api.search.brave.com/res/v1/web/search"
 
+BRAVE_MIN_INTERVAL = 0.35   # seconds between Brave calls, across all threads
+IO_WORKERS = 8              # concurrent searches / page fetches
+VENUE_CAP = 20              # enriched venues kept per city + category
+LOOKUP_CANDIDATES = 30      # top-ranked venues considered for link lookup
+LINK_WINDOW = 1500          # chars of article text after a name searched for its links
+
+ARTICLE_CACHE_TTL = 7 * 86400    # seconds; listicle searches (new lists appear)
+VENUE_CACHE_TTL   = 30 * 86400   # seconds; "{name}" {city} lookups (websites rarely move)
+
 # ---------------------------------------------------------------------------
 # Enrichment data: neighborhoods, cuisines, venue types, ratings
 # ---------------------------------------------------------------------------
@@ -94,9 +135,10 @@ CUISINE_KEYWORDS = {
     "bakery": "Bakery", "patisserie": "Patisserie",
 }
 
+# Matched as whole words (venue_tagger), so "bar" never hits "Barbican"
 VENUE_TYPE_SIGNALS = {
-    "bar": ["cocktail bar", "wine bar", "bar ", " bar", "drinks", "cocktails",
-            "whisky", "speakeasy", "pub ", " pub", "tavern", "taproom"],
+    "bar": ["cocktail bar", "wine bar", "bar", "drinks", "cocktails",
+            "whisky", "speakeasy", "pub", "tavern", "taproom"],
     "restaurant": ["restaurant", "dining", "cuisine", "bistro", "brasserie",
                    "eatery", "kitchen", "grill", "tasting menu", "michelin",
                    "reservations required", "dinner", "lunch menu"],
@@ -104,6 +146,15 @@ VENUE_TYPE_SIGNALS = {
              "co-working", "coworking", "pastry", "bakery", "brunch spot"],
 }
 
+# First match wins; numeric scores (4.8/5, 9.2/10, 4.5 stars) are the fallback
+RATING_SIGNALS = [
+    ("⭐⭐⭐ Michelin", ["three michelin", "3 michelin", "triple michelin"]),
+    ("⭐⭐ Michelin", ["two michelin", "2 michelin", "double michelin"]),
+    ("⭐ Michelin", ["one michelin", "1 michelin", "michelin star", "michelin starred", "michelin-starred"]),
+    ("Michelin Bib Gourmand", ["bib gourmand"]),
+    ("World's 50 Best", ["world's 50 best", "worlds 50 best"]),
+]
+
 
 # --- Search query templates (Pass 1) ---
 DINING_QUERIES = [
@@ -155,24 +206,58 @@ NON_VENUE_DOMAINS = [
 # HTTP helpers
 # ---------------------------------------------------------------------------
 
-def brave_search(query: str, api_key: str, count: int = 5) -> list[dict]:
-    """Run a Brave Search query, return web results."""
-    params = urllib.parse.urlencode({
-        "q": query,
-        "count": count,
-        "search_lang": "en",
-        "result_filter": "web",
-    })
+class RateLimiter:
+    """Thread-safe minimum spacing between calls."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+BRAVE_LIMITER = RateLimiter(BRAVE_MIN_INTERVAL)
+BRAVE_CACHE = BraveCache()
+VENUE_KB = VenueKB()
+
+# Leaf I/O only (searches, page fetches) — tasks on this pool never submit to it,
+# so city/category threads can block on it without deadlocking.
+IO_POOL = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="scout-io")
+
+
+def _log(tag: str, msg: str):
+    print(f"    [{tag}] {msg}")
+
+
+def brave_search(query: str, api_key: str, count: int = 5, ttl: float = ARTICLE_CACHE_TTL) -> list[dict]:
+    """Run a Brave Search query (or answer it from BRAVE_CACHE), return web results."""
+    extra = {"search_lang": "en", "result_filter": "web"}
+    key = cache_key(query, count, extra)
+    cached = BRAVE_CACHE.get(key, ttl)
+    if cached is not None:
+        return cached
+
+    BRAVE_LIMITER.wait()
+    params = urllib.parse.urlencode({"q": query, "count": count, **extra})
     req = urllib.request.Request(
         f"{BRAVE_API_URL}?{params}",
         headers={"Accept": "application/json", "X-Subscription-Token": api_key},
     )
     try:
         with urllib.request.urlopen(req, timeout=12) as resp:
-            return json.loads(resp.read().decode("utf-8")).get("web", {}).get("results", [])
+            results = json.loads(resp.read().decode("utf-8")).get("web", {}).get("results", [])
     except Exception as e:
         print(f"    [warn] Search failed '{query[:60]}': {e}")
         return []
+    BRAVE_CACHE.put(key, results)
+    return results
 
 
 def fetch_page(url: str) -> str:
@@ -201,26 +286,14 @@ def fetch_page(url: str) -> str:
         return ""
 
 
-def strip_tags(html: str) -> str:
-    """Remove HTML tags and decode common entities."""
-    text = re.sub(r'<[^>]+>', ' ', html)
-    text = re.sub(r'&amp;', '&', text)
-    text = re.sub(r'&nbsp;', ' ', text)
-    text = re.sub(r'&#x27;|&apos;', "'", text)
-    text = re.sub(r'&quot;', '"', text)
-    text = re.sub(r'&#\d+;', '', text)
-    text = re.sub(r'&[a-z]+;', '', text)
-    return re.sub(r'\s+', ' ', text).strip()
-
-
 # ---------------------------------------------------------------------------
 # Pass 1: find curated articles
 # ---------------------------------------------------------------------------
 
 def search_articles(city: str, prefs: dict, api_key: str, work: bool = False,
-                    hint_type: str = "") -> list[dict]:
+                    hint_type: str = "", tag: str = "") -> list[dict]:
     """
-    Run search queries, return top article results from trusted domains.
+    Run search queries (concurrently), return top article results from trusted domains.
     hint_type: "restaurant" | "bar" | "" — propagated to articles for type tagging.
     """
     vibe = prefs.get("vibe", "upscale-casual local")
@@ -231,10 +304,12 @@ def search_articles(city: str, prefs: dict, api_key: str, work: bool = False,
     seen_urls: set[str] = set()
     articles = []
 
-    for q_tmpl in queries:
-        q = q_tmpl.format(city=city, vibe=vibe)
-        print(f"    → {q}")
-        for r in brave_search(q, api_key, count=7):
+    qs = [q_tmpl.format(city=city, vibe=vibe) for q_tmpl in queries]
+    for q in qs:
+        _log(tag or city, f"→ {q}")
+    # map() yields in query order, so dedupe/ordering matches a serial run
+    for results in IO_POOL.map(lambda q: brave_search(q, api_key, count=7), qs):
+        for r in results:
             url = r.get("url", "")
             if url in seen_urls:
                 continue
@@ -247,7 +322,6 @@ def search_articles(city: str, prefs: dict, api_key: str, work: bool = False,
                 "trusted": domain_match,
                 "hint_type": hint_type,
             })
-        time.sleep(0.4)
 
     articles.sort(key=lambda a: (not a["trusted"], -len(a["description"])))
     return articles
@@ -257,123 +331,125 @@ def search_articles(city: str, prefs: dict, api_key: str, work: bool = False,
 # Pass 2: extract venue names from article HTML
 # ---------------------------------------------------------------------------
 
-def extract_names_from_html(html: str) -> list[str]:
+SKIP_TAGS = {"script", "style", "nav", "header", "footer"}
+HEADING_TAGS = {"h2", "h3", "h4"}
+ARROWS_RE = re.compile(r'→|Arrow|»|›')
+NUMBER_PREFIX_RE = re.compile(r'^\d+[\.\):\-]\s*')
+CAPITALISED_RE = re.compile(r'^[A-Z\u00C0-\u017E]')
+NOISE_FILTER = NoiseFilter()   # noise-rules.json
+
+
+class ArticlePage(HTMLParser):
     """
-    Pull venue names out of listicle HTML.
-    Tries multiple patterns: numbered headings, bold names, anchor text.
+    Single html.parser walk over a listicle page, skipping script/style/nav/
+    header/footer. Collects, in document order:
+      headings  — h2–h4 text (leading "1." numbering removed)
+      strongs   — <strong> text inside an li/p
+      li_links  — text of an <a> that opens an li
+      text      — visible text, and anchors: (offset into text, url) of every
+                  absolute link, for harvest_links()
     """
-    # Remove scripts/styles/nav
-    html = re.sub(r'<script[^>]*>.*?</script>', ' ', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<style[^>]*>.*?</style>', ' ', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<nav[^>]*>.*?</nav>', ' ', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<header[^>]*>.*?</header>', ' ', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<footer[^>]*>.*?</footer>', ' ', html, flags=re.DOTALL | re.IGNORECASE)
-    # Convert arrow entities/icons to nothing before stripping
-    html = re.sub(r'(?:&#x2192;|&#8594;|→|Arrow|»|›)', '', html)
-
-    names: list[str] = []
-
-    # Pattern A: <h2> or <h3> headings, optionally preceded by a number
-    for m in re.finditer(r'<h[2-4][^>]*>(.*?)</h[2-4]>', html, re.DOTALL | re.IGNORECASE):
-        raw = strip_tags(m.group(1))
-        raw = re.sub(r'^\d+[\.\):\-]\s*', '', raw).strip()
-        if 3 < len(raw) < 65:
-            names.append(raw)
-
-    # Pattern B: <strong> in list items (Eater, Infatuation style)
-    for m in re.finditer(r'<(?:li|p)[^>]*>.*?<strong>(.*?)</strong>', html, re.DOTALL | re.IGNORECASE):
-        raw = strip_tags(m.group(1)).strip()
-        if 3 < len(raw) < 65:
-            names.append(raw)
-
-    # Pattern C: anchor text inside list items
-    for m in re.finditer(r'<li[^>]*>\s*(?:<[^>]+>)*\s*<a[^>]*>(.*?)</a>', html, re.DOTALL | re.IGNORECASE):
-        raw = strip_tags(m.group(1)).strip()
-        if 3 < len(raw) < 55 and re.match(r'^[A-Z\u00C0-\u017E]', raw):
-            names.append(raw)
-
-    # Deduplicate and filter noise
-    NOISE_EXACT = {
-        "best", "top", "home", "menu", "about", "contact", "read more",
-        "learn more", "see more", "reservations", "book now", "click here",
-        "visit website", "get directions", "view on map", "instagram",
-        "twitter", "facebook", "share", "newsletter", "sign up", "login",
-        "search", "london", "paris", "new york", "san francisco", "the spots",
-        "central", "north", "south", "east", "west", "map", "back to top",
-        "choose a city", "choose a time out city", "choose a time out market",
-        # Michelin / structured page labels
-        "address", "opening hours", "opening times", "expect to pay",
-        "telephone", "website", "email", "cuisine", "price range", "facilities",
-        "link visit website", "book a table", "booking book a table",
-        "more in dining out in sf", "more maps in eater sf",
-        "nicola parisi dining out in sf", "dining out in sf", "the latest",
-        "youtube", "more maps", "visit website", "link", "booking",
-        # Footer / legal / nav links
-        "editorial guidelines", "accessibility statement", "terms of use",
-        "modern slavery statement", "privacy policy", "cookie policy",
-        "advertise with us", "contact us", "about us", "our team",
-        "advertising", "sitemap", "newsletter signup", "press",
-        "investor relations", "our awards", "work for time out",
-        "privacy notice", "do not sell my information", "manage cookies",
-        "get listed", "claim your listing", "time out offers faq",
-        "time out offers", "time out market", "time out worldwide",
-        "press office", "stay in the loop", "movies", "restaurants",
-        "bars", "music", "film", "theatre", "art", "travel",
-        "things to do", "nightlife", "shopping", "hotels",
-    }
-    NOISE_PATTERNS = [
-        r'^\d{4}',                          # Starts with year like "2025:"
-        r'[?!]$',                           # Ends with question/exclamation
-        r'^(what|why|how|where|when|who)\b', # Question words
-        r'^\s*:',                           # Starts with colon
-        r'^(top|best|the best|our|we|i)\s+\d', # "Top 10..." headers
-        r'\bcocktail bars\b',
-        r'\brestaurants in\b',
-        r'\bbars in\b',
-        r'^\+?\d[\d\s\(\)\-]{6,}',           # Phone numbers
-        r'^phone\b',                         # "Phone ..."
-        r'^(more\s+(in|maps)\b)',            # "More in..." / "More maps..."
-        r'\bvisit website\b',
-        r'^link\b',
-        r'@',                               # Email addresses
-        r'^\w+\.com\b',                     # Bare domain names
-        r'^\d+\s+comment',                  # "1 Comment"
-        r'^📍',                             # Emoji nav items
-        r'^🏡',
-        r'ready to book',
-        r'ultimate guide to',
-        r'\brestaurants$',           # "Fine Dining Restaurants", "Asian & African Restaurants"
-        r'^(fine dining|casual dining)',
-        r'food in (paris|london|san francisco)',
-        r'^hit list\b',
-        r'^new openings\b',
-        r'^the new spots\b',
-        r'^the new restaurants\b',
-        r'sign up to our',
-        r'\btime out\b',
-        r'^\d+ comment',
-        r'^sign up\b',
-        # Infatuation "stats card" patterns (descriptive review metrics, not venue names)
-        r'\baverage bill\b',
-        r'\bteam visits\b',
-        r'\bseats at\b',
-        r'\bwait time\b',
-        r'\bwalk-?in\b.*\bchance\b',
-        r'\bthat made us\b',
-        r'\bmid-sentence\b',
-        r'\bdelivered by\b',
-        r'\bdramatically presented\b',
-        r'\bnumber of bites\b',
-        r'\bbefore you realise\b',
-        r'\bworth ordering\b',
-        r'\bworth the\b',
-        r'\bdistance between\b',
-        r'\bblowtorch\b',
-        r'^guide to (the|our|a|an)\b',
-        r'^french style\b',
-        r'^(latest|subscribe|newsletter)\b',
-        r'\btravel guide',
-    ]
+
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=True)
+        self.headings: list[str] = []
+        self.strongs: list[str] = []
+        self.li_links: list[str] = []
+        self.anchors: list[tuple[int, str]] = []
+        self._chunks: list[str] = []
+        self._length = 0
+        self._skip = 0
+        self._blocks = 0          # open li/p elements
+        self._li_start = False    # inside an li, before any text
+        self._heading: list[str] | None = None
+        self._strong: list[str] | None = None
+        self._li_link: list[str] | None = None
+        self.feed(html)
+        self.close()
+
+    @property
+    def text(self) -> str:
+        return " ".join(self._chunks)
+
+    def candidates(self) -> list[str]:
+        """Raw name candidates, headings first (same order as the old regex passes)."""
+        return self.headings + self.strongs + self.li_links
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        if self._skip:
+            return
+        if tag in HEADING_TAGS:
+            self._heading = []
+        elif tag in ("li", "p"):
+            self._blocks += 1
+            if tag == "li":
+                self._li_start = True
+        elif tag == "strong" and self._blocks:
+            self._strong = []
+        elif tag == "a":
+            if self._li_start:
+                self._li_link = []
+            href = (dict(attrs).get("href") or "").strip()
+            if href.startswith("http"):
+                self.anchors.append((self._length, href.rstrip("/")))
+        for buf in (self._heading, self._strong, self._li_link):
+            if buf is not None:
+                buf.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip:
+            self._skip -= 1
+            return
+        if self._skip:
+            return
+        if tag in HEADING_TAGS and self._heading is not None:
+            name = NUMBER_PREFIX_RE.sub('', _captured(self._heading)).strip()
+            if 3 < len(name) < 65:
+                self.headings.append(name)
+            self._heading = None
+        elif tag in ("li", "p") and self._blocks:
+            self._blocks -= 1
+            self._li_start = False
+        elif tag == "strong" and self._strong is not None:
+            name = _captured(self._strong)
+            if 3 < len(name) < 65:
+                self.strongs.append(name)
+            self._strong = None
+        elif tag == "a" and self._li_link is not None:
+            name = _captured(self._li_link)
+            if 3 < len(name) < 55 and CAPITALISED_RE.match(name):
+                self.li_links.append(name)
+            self._li_link = None
+        for buf in (self._heading, self._strong, self._li_link):
+            if buf is not None:
+                buf.append(" ")
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        for buf in (self._heading, self._strong, self._li_link):
+            if buf is not None:
+                buf.append(data)
+        text = " ".join(data.split())
+        if text:
+            self._li_start = False
+            self._chunks.append(text)
+            self._length += len(text) + 1
+
+
+def _captured(pieces: list[str]) -> str:
+    return " ".join(ARROWS_RE.sub('', "".join(pieces)).split())
+
+
+def extract_names(page: ArticlePage) -> list[str]:
+    """
+    Venue names from a parsed listicle: numbered headings, bold names in
+    list items / paragraphs, and list-item anchor text, minus whatever
+    NOISE_FILTER (noise-rules.json) marks as nav/footer/label noise.
+    """
+    names = page.candidates()
 
     seen: set[str] = set()
     clean: list[str] = []
@@ -382,12 +458,7 @@ def extract_names_from_html(html: str) -> list[str]:
         key = n.lower().strip()
         if key in seen or len(key) <= 3:
             continue
-        if key in NOISE_EXACT:
-            continue
-        if any(re.search(p, key, re.IGNORECASE) for p in NOISE_PATTERNS):
-            continue
-        # Skip all-caps words that aren't acronyms (likely UI labels like "THE SPOTS")
-        if n.isupper() and len(n) > 5:
+        if NOISE_FILTER.match(n):
             continue
         seen.add(key)
         clean.append(n)
@@ -395,70 +466,105 @@ def extract_names_from_html(html: str) -> list[str]:
     return clean[:25]
 
 
-# ---------------------------------------------------------------------------
-# Pass 2b: for each venue name, find its direct website + reservation link
-# ---------------------------------------------------------------------------
+def _reservation_platform(url: str) -> str | None:
+    for domain, platform in RESERVATION_DOMAINS.items():
+        if domain in url:
+            return platform
+    return None
 
-def extract_neighbourhood(text: str, city: str) -> str:
-    """Find a neighbourhood mention in text for the given city."""
-    city_key = city.lower()
-    neighbourhoods = CITY_NEIGHBOURHOODS.get(city_key, [])
-    text_lower = text.lower()
-    for n in neighbourhoods:
-        if n.lower() in text_lower:
-            return n
-    return ""
 
+def _is_venue_website(url: str, name: str) -> bool:
+    """Not an article/aggregator domain, and the domain contains a word of the name."""
+    if any(d in url for d in NON_VENUE_DOMAINS):
+        return False
+    try:
+        domain = urllib.parse.urlparse(url).netloc.lower().lstrip("www.")
+    except Exception:
+        domain = ""
+    name_words = [w for w in re.split(r'\W+', name.lower()) if len(w) > 2]
+    return any(w in domain for w in name_words)
+
+
+def _name_windows(page: ArticlePage, names: list[str]):
+    """(start, end, name) for each occurrence of a name: up to the next other name, at most LINK_WINDOW chars."""
+    lower = page.text.lower()
+    occurrences: list[tuple[int, str]] = []
+    for name in names:
+        key = name.lower()
+        i = lower.find(key)
+        while i != -1:
+            occurrences.append((i, name))
+            i = lower.find(key, i + len(key))
+    occurrences.sort()
+
+    for n, (start, name) in enumerate(occurrences):
+        end = start + LINK_WINDOW
+        for nxt, other in occurrences[n + 1:]:
+            # the next *other* venue ends the window; "Dishoom" doesn't end "The Dishoom"'s
+            if nxt >= start + len(name) and other.lower() not in name.lower():
+                end = min(end, nxt)
+                break
+        yield start, end, name
 
-def extract_cuisine(text: str) -> str:
-    """Infer cuisine/bar type from description text."""
-    text_lower = text.lower()
-    for keyword, label in CUISINE_KEYWORDS.items():
-        if keyword in text_lower:
-            return label
-    return ""
 
+def _blurb(text: str, start: int, end: int, name: str) -> str:
+    return re.sub(r'\s*\d+[.)]?$', '', text[start + len(name):end].rstrip()).strip(" :-–—")[:250]
 
-def infer_venue_type(text: str, is_work: bool = False) -> str:
-    """Classify venue as bar / restaurant / cafe from description text."""
-    if is_work:
-        return "cafe"
-    text_lower = text.lower()
-    scores = {vtype: 0 for vtype in VENUE_TYPE_SIGNALS}
-    for vtype, signals in VENUE_TYPE_SIGNALS.items():
-        for s in signals:
-            if s in text_lower:
-                scores[vtype] += 1
-    best = max(scores, key=lambda t: scores[t])
-    return best if scores[best] > 0 else "restaurant"
-
-
-def extract_rating(text: str) -> str:
-    """Pull a rating from description text (stars, scores, Michelin)."""
-    text_lower = text.lower()
-    # Michelin stars
-    if "three michelin" in text_lower or "3 michelin" in text_lower:
-        return "⭐⭐⭐ Michelin"
-    if "two michelin" in text_lower or "2 michelin" in text_lower:
-        return "⭐⭐ Michelin"
-    if "one michelin" in text_lower or "1 michelin" in text_lower or "michelin star" in text_lower:
-        return "⭐ Michelin"
-    if "michelin" in text_lower and "bib gourmand" in text_lower:
-        return "Michelin Bib Gourmand"
-    # World's 50 Best
-    if "world's 50 best" in text_lower or "worlds 50 best" in text_lower:
-        return "World's 50 Best"
-    # Numeric ratings: 4.8/5, 4.8 stars, 9.2/10
-    m = re.search(r'(\d+\.?\d*)\s*/\s*5\b', text)
-    if m and float(m.group(1)) >= 4.0:
-        return f"{m.group(1)}/5"
-    m = re.search(r'(\d+\.?\d*)\s*(?:star|★)', text, re.IGNORECASE)
-    if m and float(m.group(1)) >= 4.0:
-        return f"★ {m.group(1)}"
-    m = re.search(r'(\d+\.?\d*)\s*/\s*10\b', text)
-    if m and float(m.group(1)) >= 8.0:
-        return f"{m.group(1)}/10"
-    return ""
+
+def name_blurbs(page: ArticlePage, names: list[str]) -> dict[str, str]:
+    """The article's text about each name, from its first non-empty window."""
+    blurbs: dict[str, str] = {}
+    for start, end, name in _name_windows(page, names):
+        if not blurbs.get(name):
+            blurbs[name] = _blurb(page.text, start, end, name)
+    return blurbs
+
+
+def harvest_links(page: ArticlePage, names: list[str], page_url: str = "") -> dict[str, dict]:
+    """
+    Find the outbound links an article places next to each venue name.
+
+    For each occurrence of a name in the page text, the anchors between it
+    and the next name (at most LINK_WINDOW chars on) are classified with
+    RESERVATION_DOMAINS / NON_VENUE_DOMAINS; links back to the article's own
+    site are ignored. Returns {name: {website, reservation_url,
+    reservation_platform, description}} for names with at least one link;
+    description is the article's text about the venue.
+    """
+    page_host = urllib.parse.urlparse(page_url).netloc.lower()
+    anchors = [(at, url) for at, url in page.anchors if urllib.parse.urlparse(url).netloc.lower() != page_host]
+    offsets = [a[0] for a in anchors]
+
+    found: dict[str, dict] = {}
+    for start, end, name in _name_windows(page, names):
+        if name in found:
+            continue
+        website = reservation_url = reservation_platform = None
+        for _, url in anchors[bisect.bisect_left(offsets, start):bisect.bisect_left(offsets, end)]:
+            platform = _reservation_platform(url)
+            if platform and not reservation_url:
+                reservation_url, reservation_platform = url, platform
+            elif not platform and not website and _is_venue_website(url, name):
+                website = url
+        if website or reservation_url:
+            found[name] = {
+                "website": website,
+                "reservation_url": reservation_url,
+                "reservation_platform": reservation_platform,
+                "description": _blurb(page.text, start, end, name),
+            }
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Pass 2b: for each venue name, find its direct website + reservation link
+# ---------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def tagger_for(city: str) -> VenueTagger:
+    """Enrichment tagger for a city (its neighbourhoods + the shared keyword lists), built once."""
+    return VenueTagger(CITY_NEIGHBOURHOODS.get(city.lower(), []), CUISINE_KEYWORDS,
+                       VENUE_TYPE_SIGNALS, RATING_SIGNALS)
 
 
 def find_venue_links(name: str, city: str, api_key: str, is_work: bool = False) -> dict:
@@ -469,8 +575,7 @@ def find_venue_links(name: str, city: str, api_key: str, is_work: bool = False)
       - neighbourhood, cuisine, type, rating (enrichment)
     """
     query = f'"{name}" {city}'
-    results = brave_search(query, api_key, count=6)
-    time.sleep(0.3)
+    results = brave_search(query, api_key, count=6, ttl=VENUE_CACHE_TTL)
 
     website = None
     reservation_url = None
@@ -480,45 +585,36 @@ def find_venue_links(name: str, city: str, api_key: str, is_work: bool = False)
     for r in results:
         url = r.get("url", "").rstrip("/")
         desc = r.get("description", "")
-        title = r.get("title", "")
         if desc:
             all_desc.append(desc)
 
-        # Check reservation platforms
-        for domain, platform in RESERVATION_DOMAINS.items():
-            if domain in url and not reservation_url:
-                reservation_url = url
-                reservation_platform = platform
-                break
+        platform = _reservation_platform(url)
+        if platform and not reservation_url:
+            reservation_url = url
+            reservation_platform = platform
 
-        # Official venue website check
-        is_noise = any(d in url for d in NON_VENUE_DOMAINS)
-        if not is_noise and not website:
-            try:
-                domain = urllib.parse.urlparse(url).netloc.lower().lstrip("www.")
-            except Exception:
-                domain = ""
-            name_words = [w for w in re.split(r'\W+', name.lower()) if len(w) > 2]
-            domain_match = any(w in domain for w in name_words)
-            if domain_match:
-                website = url
+        if not website and _is_venue_website(url, name):
+            website = url
+
+    return _venue_details(name, city, website, reservation_url, reservation_platform,
+                          " ".join(all_desc), is_work)
 
-    combined = " ".join(all_desc)
-    neighbourhood = extract_neighbourhood(combined, city)
-    cuisine = extract_cuisine(combined)
-    venue_type = infer_venue_type(combined, is_work=is_work)
-    rating = extract_rating(combined)
 
+def venue_from_article(name: str, city: str, links: dict, is_work: bool = False) -> dict:
+    """Venue details from links + text harvested out of an article (no search)."""
+    return _venue_details(name, city, links["website"], links["reservation_url"],
+                          links["reservation_platform"], links["description"], is_work)
+
+
+def _venue_details(name: str, city: str, website, reservation_url, reservation_platform,
+                   combined: str, is_work: bool) -> dict:
     return {
         "name": name,
         "website": website,
         "reservation_url": reservation_url,
         "reservation_platform": reservation_platform,
         "description": combined[:250] if combined else "",
-        "neighbourhood": neighbourhood,
-        "cuisine": cuisine,
-        "type": venue_type,
-        "rating": rating,
+        **tagger_for(city).tag(combined, is_work=is_work),
     }
 
 
@@ -534,13 +630,15 @@ def scout_city(city: str, trip: dict, api_key: str) -> tuple[list[dict], list[di
     prefs = trip.get("preferences", {})
     categories = prefs.get("categories", [])
 
-    print(f"\n  ── {city}: dining & bars ──")
-    dining = _scout_category(city, prefs, api_key, work=False)
-
-    work: list[dict] = []
-    if "work-friendly" in categories:
-        print(f"\n  ── {city}: work-friendly cafes ──")
-        work = _scout_category(city, prefs, api_key, work=True)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        print(f"\n  ── {city}: dining & bars ──")
+        dining_job = pool.submit(_scout_category, city, prefs, api_key, False)
+        work_job = None
+        if "work-friendly" in categories:
+            print(f"  ── {city}: work-friendly cafes ──")
+            work_job = pool.submit(_scout_category, city, prefs, api_key, True)
+        dining = dining_job.result()
+        work: list[dict] = work_job.result() if work_job else []
 
     return dining, work
 
@@ -555,16 +653,23 @@ def _article_type_hint(url: str) -> str:
     return ""
 
 
+def _clean_venue_name(n: str) -> str:
+    """Strip appended location suffixes like ', Kentish Town' or ' - South Kensington'."""
+    return re.sub(r'\s*[,\-–]\s*[A-Z][a-zA-Z\s]{3,25}$', '', n).strip()
+
+
 def _scout_category(city: str, prefs: dict, api_key: str, work: bool) -> list[dict]:
     """
     One category (dining OR work) for a city.
     Pass 1 → articles. Pass 2 → extract names → lookup links + enrich.
     """
-    articles = search_articles(city, prefs, api_key, work=work)
     label = "work cafes" if work else "dining"
-    print(f"    Found {len(articles)} {label} articles for {city}")
+    category = "work" if work else "dining"
+    tag = f"{city} · {label}"
+    articles = search_articles(city, prefs, api_key, work=work, tag=tag)
+    _log(tag, f"Found {len(articles)} {label} articles for {city}")
 
-    all_pairs: list[tuple[str, str]] = []   # (name, source_type_hint)
+    name_mentions: list[dict] = []            # one per name per fetched article, see venue_resolve
 
     if not work:
         # Explicitly balance: fetch 3 best restaurant articles + 3 best bar articles
@@ -572,42 +677,73 @@ def _scout_category(city: str, prefs: dict, api_key: str, work: bool) -> list[di
         bar_articles  = [a for a in articles if _article_type_hint(a["url"]) == "bar"]
         general_articles = [a for a in articles if _article_type_hint(a["url"]) == ""]
         fetch_list = rest_articles[:3] + bar_articles[:3] + general_articles[:2]
-        print(f"    Article mix: {len(rest_articles[:3])} restaurant, {len(bar_articles[:3])} bar, {len(general_articles[:2])} general")
+        _log(tag, f"Article mix: {len(rest_articles[:3])} restaurant, {len(bar_articles[:3])} bar, {len(general_articles[:2])} general")
     else:
         fetch_list = articles[:5]
 
     for article in fetch_list:
-        url = article["url"]
-        hint = _article_type_hint(url)
-        print(f"    Fetching [{hint or 'general'}] {url[:65]}...")
-        html = fetch_page(url)
+        _log(tag, f"Fetching [{_article_type_hint(article['url']) or 'general'}] {article['url'][:65]}...")
+    pages = IO_POOL.map(fetch_page, [a["url"] for a in fetch_list])
+    for article, html in zip(fetch_list, pages):
         if not html:
             continue
-        names = extract_names_from_html(html)
-        print(f"      Extracted {len(names)} names")
-        all_pairs.extend((n, hint) for n in names)
-        time.sleep(0.3)
+        hint = _article_type_hint(article["url"])
+        page = ArticlePage(html)
+        names = extract_names(page)
+        links = harvest_links(page, names, article["url"])
+        blurbs = name_blurbs(page, names)
+        _log(tag, f"  Extracted {len(names)} names ({len(links)} with links) from {article['url'][:50]}")
+        for i, n in enumerate(names, 1):
+            name_mentions.append({
+                "name": _clean_venue_name(n), "hint": hint, "url": article["url"], "title": article["title"],
+                "position": i, "out_of": len(names), "trusted": article["trusted"], "links": links.get(n),
+                "rating": tagger_for(city).tag(blurbs.get(n, ""))["rating"],
+            })
 
-    def _clean_venue_name(n: str) -> str:
-        """Strip appended location suffixes like ', Kentish Town' or ' - South Kensington'."""
-        n = re.sub(r'\s*[,\-–]\s*[A-Z][a-zA-Z\s]{3,25}$', '', n).strip()
-        return n
+    # Merge name variants across articles ("Kiln" / "Kiln Soho") and rank the venues
+    # by independent sources, list position and rating; only the best get looked up.
+    clusters = resolve_venues(name_mentions, city, CITY_NEIGHBOURHOODS.get(city.lower(), []))
+    _log(tag, f"{len(name_mentions)} name mentions → {len(clusters)} venues — looking up links...")
 
-    seen: set[str] = set()
-    unique: list[tuple[str, str]] = []
-    for raw_n, hint in all_pairs:
-        n = _clean_venue_name(raw_n)
-        key = n.lower().strip()
-        if key not in seen and len(key) > 3:
-            seen.add(key)
-            unique.append((n, hint))
+    # Look up in waves of exactly as many venues as still needed, taking
+    # results in rank order: same venues, and no more Brave calls, than a serial loop.
+    # Venues the KB enriched recently (kept or rejected, under any variant) aren't
+    # looked up again, and venues the articles already linked skip the search.
+    def lookup(cluster: VenueCluster) -> dict:
+        if cluster.links:
+            return venue_from_article(cluster.name, city, cluster.links, is_work=work)
+        return find_venue_links(cluster.name, city, api_key, is_work=work)
 
-    print(f"    {len(unique)} unique names — looking up links...")
+    def known(cluster: VenueCluster) -> dict | None:
+        return next(filter(None, (VENUE_KB.fresh(city, category, v) for v in cluster.variants)), None)
 
     venues: list[dict] = []
-    for name, source_hint in unique[:30]:
-        print(f"      → {name}")
-        details = find_venue_links(name, city, api_key, is_work=work)
+    counts = {"known": 0, "known, rejected": 0, "article links": 0, "search": 0}
+    candidates = clusters[:LOOKUP_CANDIDATES]
+    while candidates and len(venues) < VENUE_CAP:
+        need = VENUE_CAP - len(venues)
+        wave, candidates = candidates[:need], candidates[need:]
+        stored = [known(c) for c in wave]
+        for c, k in zip(wave, stored):
+            source = (("known, rejected" if k["status"] == "rejected" else "known") if k else
+                      "article links" if c.links else "search")
+            counts[source] += 1
+            _log(tag, f"  → {c.name}" + (f" ({source})" if source != "search" else ""))
+        looked_up = IO_POOL.map(lookup, [c for c, k in zip(wave, stored) if not k])
+        details = [k or next(looked_up) for k in stored]
+        kept = _keep_venues((((c.name, c.hint), d) for c, d in zip(wave, details)), city)
+        for c, d, k in zip(wave, details, stored):
+            VENUE_KB.record(city, category, c.name, d, kept=any(d is v for v in kept), enriched=not k,
+                            mentions=c.sources, aliases=tuple(c.variants), score=c.score)
+        venues += kept
+    _log(tag, f"{len(venues)} venues kept; " + ", ".join(f"{n} {s}" for s, n in counts.items()))
+    return venues
+
+
+def _keep_venues(lookups, city: str) -> list[dict]:
+    """Filter + type-fix looked-up venues ((name, source_hint), details), in order."""
+    venues: list[dict] = []
+    for (name, source_hint), details in lookups:
         details["city"] = city
         # Drop obvious noise: no description and no website means the search found nothing real
         if not details.get("description") and not details.get("website"):
@@ -620,9 +756,6 @@ def _scout_category(city: str, prefs: dict, api_key: str, work: bool) -> list[di
             if any(w in desc for w in ["restaurant", "cuisine", "chef", "dinner", "dining", "menu", "kitchen"]):
                 details["type"] = "restaurant"
         venues.append(details)
-        if len(venues) >= 20:  # Cap clean results at 20
-            break
-
     return venues
 
 
@@ -638,7 +771,8 @@ def _venue_row(v: dict, i: int) -> str:
     neighbourhood = v.get("neighbourhood", "")
     cuisine = v.get("cuisine", "")
     rating = v.get("rating", "")
-    tags = " · ".join(t for t in [neighbourhood, cuisine, rating] if t)
+    carried = f"from {v['last_seen']} scout" if v.get("carried_over") else ""
+    tags = " · ".join(t for t in [neighbourhood, cuisine, rating, carried] if t)
     desc = (v.get("description") or "").replace("|", "-")[:80]
     notes = f"{tags} | {desc}" if tags else desc
 
@@ -780,16 +914,68 @@ def write_candidates_md(trip: dict, city_dining: dict[str, list], city_work: dic
 # Main
 # ---------------------------------------------------------------------------
 
+def venues_from_kb(trip: dict) -> tuple[dict[str, list], dict[str, list]]:
+    """The trip's (city_dining, city_work) as queried from VENUE_KB."""
+    wants_work = "work-friendly" in trip.get("preferences", {}).get("categories", [])
+    city_dining = {city: VENUE_KB.venues(city, "dining", VENUE_CAP) for city in trip["cities"]}
+    city_work = {city: VENUE_KB.venues(city, "work", VENUE_CAP) if wants_work else [] for city in trip["cities"]}
+    return city_dining, city_work
+
+
+def fill_from_kb(trip: dict, city_dining: dict[str, list], city_work: dict[str, list]):
+    """Pad this run's lists up to VENUE_CAP with KB venues it didn't mention, marked carried_over."""
+    wants_work = "work-friendly" in trip.get("preferences", {}).get("categories", [])
+    today = datetime.date.today().isoformat()
+    for category, city_lists in (("dining", city_dining), ("work", city_work if wants_work else {})):
+        for city, venues in city_lists.items():
+            if len(venues) < VENUE_CAP:
+                venues += [{**v, "carried_over": True}
+                           for v in VENUE_KB.venues(city, category, VENUE_CAP - len(venues), seen_before=today)]
+
+
+def extract_pages(paths: list[str]):
+    """Run Pass 2 extraction on saved article pages and report what it finds + how long it takes."""
+    for path in paths:
+        html = Path(path).read_text(encoding="utf-8", errors="replace")
+        started = time.perf_counter()
+        page = ArticlePage(html)
+        names = extract_names(page)
+        links = harvest_links(page, names)
+        ms = (time.perf_counter() - started) * 1000
+        print(f"{path}: {len(names)} names, {len(links)} with links — {ms:.1f} ms for {len(html) // 1024} KB")
+        for n in names:
+            found = links.get(n, {})
+            link = found.get("reservation_url") or found.get("website") or ""
+            print(f"  {n}" + (f"  → {link}" if link else ""))
+    print(NOISE_FILTER.summary())
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Scout venues for upcoming trips")
+    parser.add_argument("trip_id", nargs="?", help="Only this trip (default: all)")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached Brave responses (still updates the cache)")
+    parser.add_argument("--cache-ttl", type=float, metavar="DAYS", help="Override the per-query cache TTLs")
+    parser.add_argument("--from-kb", action="store_true", help="Write trip files from venues.db without scouting")
+    parser.add_argument("--fill-from-kb", action="store_true",
+                        help="Pad lists short of the cap with venues from earlier scouts (marked carried_over)")
+    parser.add_argument("--extract", nargs="+", metavar="HTML", help="Only run name/link extraction on saved pages")
+    args = parser.parse_args()
+
+    if args.extract:
+        extract_pages(args.extract)
+        return
+
     api_key = os.environ.get("BRAVE_API_KEY")
-    if not api_key:
+    if not api_key and not args.from_kb:
         print("ERROR: BRAVE_API_KEY not set.")
         sys.exit(1)
 
     trips_data = json.loads(TRIPS_FILE.read_text())
     trips = trips_data.get("trips", [])
+    BRAVE_CACHE.load(refresh=args.refresh, ttl_days=args.cache_ttl)
+    VENUE_KB.open()
 
-    filter_id = sys.argv[1] if len(sys.argv) > 1 else None
+    filter_id = args.trip_id
     if filter_id:
         trips = [t for t in trips if t["id"] == filter_id]
         if not trips:
@@ -802,21 +988,31 @@ def main():
         print(f"\n{'='*60}")
         print(f"Trip: {trip['id']}  |  {', '.join(trip['cities'])}  |  {trip['dates']['start']} → {trip['dates']['end']}")
 
-        city_dining: dict[str, list] = {}
-        city_work: dict[str, list] = {}
-
-        for city in trip["cities"]:
-            dining, work = scout_city(city, trip, api_key)
-            city_dining[city] = dining
-            city_work[city] = work
-            print(f"\n  {city}: {len(dining)} dining venues, {len(work)} work cafes extracted")
+        if args.from_kb:
+            city_dining, city_work = venues_from_kb(trip)
+        else:
+            city_dining: dict[str, list] = {}
+            city_work: dict[str, list] = {}
+            with ThreadPoolExecutor(max_workers=len(trip["cities"]) or 1) as pool:
+                results = pool.map(lambda c: scout_city(c, trip, api_key), trip["cities"])
+                for city, (dining, work) in zip(trip["cities"], results):
+                    city_dining[city] = dining
+                    city_work[city] = work
+                    print(f"\n  {city}: {len(dining)} dining venues, {len(work)} work cafes extracted")
+            if args.fill_from_kb:
+                fill_from_kb(trip, city_dining, city_work)
 
         write_venues_json(trip, city_dining, city_work)
         write_venues_md(trip, city_dining, city_work)
         write_candidates_md(trip, city_dining, city_work)
+        BRAVE_CACHE.save()
         print(f"\n✓ Done: {trip['id']}")
 
+    VENUE_KB.close()
     print("\nAll trips processed.")
+    if not args.from_kb:
+        print(BRAVE_CACHE.summary())
+        print(NOISE_FILTER.summary())
     print("Next: review candidates.md, then run travel-reservations.py.")
 
 
@@ -0,0 +1,233 @@
+"""
+venue_kb.py — Cross-trip venue knowledge base for travel-scout.py (SQLite).
+
+Every venue a scout enriches, or rejects because the lookup found nothing
+real, is stored per city and category ("dining" / "work"). Within those, a
+venue is found by its normalized name (any variant seen so far) or, once
+known, its website domain. Each row keeps the website, reservation link,
+tags, first/last seen dates, the score the latest scout ranked it with
+(venue_resolve.py) and the articles that mentioned it. Later scouts
+of the same city reuse anything enriched within STALE_DAYS instead of looking
+it up again. venues() lists what the KB knows for a city + category;
+travel-scout.py writes trip files from it with --from-kb, and pads a scout's
+own results from it with --fill-from-kb.
+
+A café on both lists is two rows. The scout's dining and work passes run
+concurrently, and this way they never read or write each other's venues, so
+what each finds doesn't depend on which thread got there first.
+
+Tables:
+  venues    one row per venue: details, status ('kept' | 'rejected'), dates
+  names     (city, category, name_key) → venue, one row per name variant seen
+  mentions  (venue, article url) with the name's position in that article
+
+One connection is shared by the scout's threads behind a lock.
+"""
+
+import datetime
+import re
+import sqlite3
+import threading
+import unicodedata
+import urllib.parse
+from pathlib import Path
+
+KB_FILE = Path(__file__).parent / "venues.db"
+STALE_DAYS = 30        # re-enrich venues looked up longer ago than this
+RECENT_DAYS = 180      # venues.json only lists venues mentioned this recently
+
+DETAIL_FIELDS = ("website", "reservation_url", "reservation_platform", "description",
+                 "neighbourhood", "cuisine", "type", "rating")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS venues (
+    id INTEGER PRIMARY KEY,
+    city TEXT NOT NULL,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    domain TEXT NOT NULL DEFAULT '',
+    website TEXT, reservation_url TEXT, reservation_platform TEXT, description TEXT,
+    neighbourhood TEXT, cuisine TEXT, type TEXT, rating TEXT,
+    status TEXT NOT NULL,
+    score REAL NOT NULL DEFAULT 0,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    enriched_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS venues_city_category_domain ON venues (city, category, domain);
+CREATE INDEX IF NOT EXISTS venues_city_category ON venues (city, category, status, last_seen);
+CREATE TABLE IF NOT EXISTS names (
+    city TEXT NOT NULL,
+    category TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    venue_id INTEGER NOT NULL REFERENCES venues (id),
+    PRIMARY KEY (city, category, name_key)
+);
+CREATE TABLE IF NOT EXISTS mentions (
+    venue_id INTEGER NOT NULL REFERENCES venues (id),
+    url TEXT NOT NULL,
+    title TEXT,
+    position INTEGER,
+    seen_at TEXT NOT NULL,
+    PRIMARY KEY (venue_id, url)
+);
+"""
+
+
+def name_key(name: str) -> str:
+    """"The Clove Club" / "Clove Club" / "CLOVE  CLUB!" → "clove club"; accents and & folded."""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    text = re.sub(r"[^\w\s]", " ", text.replace("&", " and "))
+    return re.sub(r"^the\s+", "", " ".join(text.split()))
+
+
+def domain_of(url: str | None) -> str:
+    if not url:
+        return ""
+    return urllib.parse.urlparse(url).netloc.lower().removeprefix("www.")
+
+
+class VenueKB:
+    def __init__(self, path: Path = KB_FILE):
+        self.path = path
+        self.conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+
+    def _migrate(self):
+        """
+        KBs from before names were keyed by category: rebuild names with each
+        venue's category. KBs from before venues were scored: add the column.
+        """
+        venue_columns = [r["name"] for r in self.conn.execute("PRAGMA table_info(venues)")]
+        if venue_columns and "score" not in venue_columns:
+            self.conn.execute("ALTER TABLE venues ADD COLUMN score REAL NOT NULL DEFAULT 0")
+        columns = [r["name"] for r in self.conn.execute("PRAGMA table_info(names)")]
+        if columns and "category" not in columns:
+            self.conn.executescript("ALTER TABLE names RENAME TO names_v1; DROP INDEX IF EXISTS venues_city_domain;")
+            self.conn.executescript(SCHEMA)
+            with self.conn:
+                self.conn.execute("INSERT OR IGNORE INTO names (city, category, name_key, venue_id)"
+                                  " SELECT n.city, v.category, n.name_key, n.venue_id"
+                                  " FROM names_v1 n JOIN venues v ON v.id = n.venue_id")
+                self.conn.execute("DROP TABLE names_v1")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _city(self, city: str) -> str:
+        return city.strip().lower()
+
+    def _find(self, city: str, category: str, name: str, domain: str = "") -> sqlite3.Row | None:
+        row = self.conn.execute(
+            "SELECT v.* FROM names n JOIN venues v ON v.id = n.venue_id"
+            " WHERE n.city = ? AND n.category = ? AND n.name_key = ?",
+            (city, category, name_key(name)),
+        ).fetchone()
+        if row is None and domain:
+            row = self.conn.execute("SELECT * FROM venues WHERE city = ? AND category = ? AND domain = ?",
+                                    (city, category, domain)).fetchone()
+        return row
+
+    def fresh(self, city: str, category: str, name: str) -> dict | None:
+        """Stored details (plus "status") if the venue was enriched within STALE_DAYS, else None."""
+        if self.conn is None:
+            return None
+        cutoff = (datetime.date.today() - datetime.timedelta(days=STALE_DAYS)).isoformat()
+        with self._lock:
+            row = self._find(self._city(city), category, name)
+        if row is None or row["enriched_at"] < cutoff:
+            return None
+        return self._venue_dict(row, city, name)
+
+    def record(self, city: str, category: str, name: str, details: dict, kept: bool,
+               enriched: bool, mentions: list[tuple[str, str, int]], aliases: tuple[str, ...] = (),
+               score: float = 0.0):
+        """
+        Store a scouted venue. enriched=True means details are from a fresh lookup
+        and replace the stored ones (unless the lookup was rejected and the stored
+        venue is kept); otherwise only last_seen / mentions move.
+        mentions: [(article url, article title, position in the article)].
+        aliases: other names the venue went by in the articles, found by later scouts too.
+        score: the venue's rank score in this scout (VenueCluster.score); replaces the stored one.
+        """
+        if self.conn is None:
+            return
+        city_key = self._city(city)
+        today = datetime.date.today().isoformat()
+        domain = domain_of(details.get("website"))
+        with self._lock, self.conn:
+            row = next(filter(None, (self._find(city_key, category, n) for n in (name, *aliases))), None)
+            if row is None and domain:
+                row = self._find(city_key, category, "", domain)
+            if row is None:
+                cur = self.conn.execute(
+                    "INSERT INTO venues (city, category, name, domain, status, first_seen, last_seen, enriched_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (city_key, category, name, domain, "kept" if kept else "rejected", today, today, today),
+                )
+                venue_id = cur.lastrowid
+            else:
+                venue_id = row["id"]
+            # A lookup that found nothing doesn't overwrite a venue already known to be real
+            if enriched and (kept or row is None or row["status"] == "rejected"):
+                self.conn.execute(
+                    f"UPDATE venues SET {', '.join(f'{f} = ?' for f in DETAIL_FIELDS)},"
+                    " domain = ?, status = ?, enriched_at = ? WHERE id = ?",
+                    (*(details.get(f) for f in DETAIL_FIELDS), domain, "kept" if kept else "rejected", today, venue_id),
+                )
+            self.conn.execute("UPDATE venues SET last_seen = ?, score = ? WHERE id = ?", (today, score, venue_id))
+            self.conn.executemany("INSERT OR IGNORE INTO names (city, category, name_key, venue_id) VALUES (?, ?, ?, ?)",
+                                  [(city_key, category, name_key(n), venue_id) for n in (name, *aliases)])
+            for url, title, position in mentions:
+                self.conn.execute(
+                    "INSERT INTO mentions (venue_id, url, title, position, seen_at) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (venue_id, url) DO UPDATE SET position = excluded.position, seen_at = excluded.seen_at",
+                    (venue_id, url, title, position, today),
+                )
+
+    def venues(self, city: str, category: str, limit: int, seen_before: str | None = None) -> list[dict]:
+        """
+        Kept venues for a city + category mentioned within RECENT_DAYS (and, with
+        seen_before, last mentioned before that date): most recently seen first,
+        then by the score that scout ranked them with, then most articles, then
+        best listicle position. "carried_over" marks venues the latest scout of
+        the city + category didn't mention.
+        """
+        if self.conn is None:
+            return []
+        since = (datetime.date.today() - datetime.timedelta(days=RECENT_DAYS)).isoformat()
+        city_key = self._city(city)
+        with self._lock:
+            latest = self.conn.execute("SELECT MAX(last_seen) FROM venues WHERE city = ? AND category = ?",
+                                       (city_key, category)).fetchone()[0]
+            rows = self.conn.execute(
+                """
+                SELECT v.*, COUNT(m.url) AS n_sources, MIN(m.position) AS best_position,
+                       GROUP_CONCAT(m.url, ' ') AS source_urls
+                FROM venues v LEFT JOIN mentions m ON m.venue_id = v.id
+                WHERE v.city = ? AND v.category = ? AND v.status = 'kept' AND v.last_seen >= ?
+                      AND (? IS NULL OR v.last_seen < ?)
+                GROUP BY v.id
+                ORDER BY v.last_seen DESC, v.score DESC, n_sources DESC, best_position, v.first_seen, v.id
+                LIMIT ?
+                """,
+                (city_key, category, since, seen_before, seen_before, limit),
+            ).fetchall()
+        return [{**self._venue_dict(r, city), "carried_over": r["last_seen"] < latest} for r in rows]
+
+    def _venue_dict(self, row: sqlite3.Row, city: str, name: str | None = None) -> dict:
+        venue = {"name": name or row["name"], **{f: row[f] for f in DETAIL_FIELDS}, "city": city,
+                 "first_seen": row["first_seen"], "last_seen": row["last_seen"]}
+        if "source_urls" in row.keys():
+            venue["sources"] = (row["source_urls"] or "").split()
+        else:
+            venue["status"] = row["status"]
+        return venue
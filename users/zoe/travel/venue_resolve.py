@@ -0,0 +1,119 @@
+"""
+venue_resolve.py — Merge venue-name variants across listicles and rank the venues for travel-scout.py.
+
+Every name mention from every fetched article is reduced to a canonical key:
+venue_kb.name_key() (case, accents, punctuation, a leading "The"), minus
+trailing words that only say where or what it is — the city, one of its
+neighbourhoods, or a generic "restaurant" / "bar" / "cafe". "Bar Termini",
+"Bar Termini Soho" and "BAR TERMINI" all become "bar termini". Nothing is
+stripped if that would leave only generic words, so "Bar Soho" stays
+itself.
+
+Mentions with the same key form one VenueCluster, ranked by:
+  - independent trusted sources (distinct LISTICLE_DOMAINS sites)  × TRUSTED_WEIGHT
+  - other independent sources                                     × SOURCE_WEIGHT
+  - best listicle position (top of a list → 1, bottom → 0)        × POSITION_WEIGHT
+  - a rating signal in the article text (Michelin, 4.6/5, ...)     × RATING_WEIGHT
+Ties keep first-seen order.
+"""
+
+import re
+
+from venue_kb import domain_of, name_key
+
+TRUSTED_WEIGHT = 3.0
+SOURCE_WEIGHT = 1.0
+POSITION_WEIGHT = 1.0
+RATING_WEIGHT = 1.0
+
+GENERIC_WORDS = {"restaurant", "restaurants", "bar", "bars", "cafe", "bistro", "pub"}
+
+
+class VenueCluster:
+    """All mentions of one venue: name variants, sources, best position, rating."""
+
+    def __init__(self, key: str, order: int):
+        self.key = key
+        self.order = order
+        self.variants: dict[str, int] = {}      # name → mention count, in first-seen order
+        self.mentions: list[dict] = []
+
+    def add(self, mention: dict):
+        self.variants[mention["name"]] = self.variants.get(mention["name"], 0) + 1
+        self.mentions.append(mention)
+
+    @property
+    def name(self) -> str:
+        """The variant that is exactly the canonical name if there is one, else the most mentioned."""
+        for variant in self.variants:
+            if name_key(variant) == self.key:
+                return variant
+        return max(self.variants, key=lambda v: self.variants[v])
+
+    @property
+    def hint(self) -> str:
+        return next((m["hint"] for m in self.mentions if m["hint"]), "")
+
+    @property
+    def links(self) -> dict | None:
+        """Links an article gave next to any of the variants (first article wins)."""
+        return next((m["links"] for m in self.mentions if m.get("links")), None)
+
+    @property
+    def rating(self) -> str:
+        return next((m["rating"] for m in self.mentions if m.get("rating")), "")
+
+    @property
+    def sources(self) -> list[tuple[str, str, int]]:
+        """[(article url, title, best position in it)] for the KB."""
+        best: dict[str, tuple[str, str, int]] = {}
+        for m in self.mentions:
+            if m["url"] not in best or m["position"] < best[m["url"]][2]:
+                best[m["url"]] = (m["url"], m["title"], m["position"])
+        return list(best.values())
+
+    @property
+    def score(self) -> float:
+        domains = {domain_of(m["url"]) for m in self.mentions}
+        trusted = {domain_of(m["url"]) for m in self.mentions if m["trusted"]}
+        best = max(1 - (m["position"] - 1) / max(m["out_of"] - 1, 1) for m in self.mentions)
+        return (TRUSTED_WEIGHT * len(trusted) + SOURCE_WEIGHT * len(domains - trusted)
+                + POSITION_WEIGHT * best + RATING_WEIGHT * bool(self.rating))
+
+
+def qualifier_suffixes(city: str, neighbourhoods: list[str]) -> list[tuple[str, ...]]:
+    """Word sequences that may trail a venue's name: the city, its neighbourhoods, generic words."""
+    phrases = {city, *neighbourhoods, *GENERIC_WORDS}
+    suffixes = {tuple(name_key(p).split()) for p in phrases}
+    return sorted((s for s in suffixes if s), key=len, reverse=True)
+
+
+def canonical_key(name: str, suffixes: list[tuple[str, ...]]) -> str:
+    words = name_key(name).split()
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in suffixes:
+            rest = words[:-len(suffix)]
+            if words[-len(suffix):] == list(suffix) and any(w not in GENERIC_WORDS for w in rest):
+                words, stripped = rest, True
+                break
+    return " ".join(words)
+
+
+def resolve_venues(mentions: list[dict], city: str, neighbourhoods: list[str]) -> list[VenueCluster]:
+    """
+    Cluster mentions into venues, best first. Each mention is a dict: name, hint,
+    url, title, position (1-based), out_of (names in that article), trusted,
+    rating, links (harvest_links() result or None).
+    """
+    suffixes = qualifier_suffixes(city, neighbourhoods)
+    clusters: dict[str, VenueCluster] = {}
+    for m in mentions:
+        key = canonical_key(m["name"], suffixes)
+        if len(key) <= 3 and not re.search(r"\d", key):
+            continue
+        if key not in clusters:
+            clusters[key] = VenueCluster(key, len(clusters))
+        clusters[key].add(m)
+    return sorted(clusters.values(), key=lambda c: (-c.score, c.order))
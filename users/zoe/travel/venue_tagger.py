@@ -0,0 +1,107 @@
+"""
+venue_tagger.py — One-pass neighbourhood / cuisine / type / rating tagging for travel-scout.py.
+
+A VenueTagger is built once per city from that city's neighbourhood list plus
+the shared cuisine, venue-type and rating keywords. All of them go into one
+prefix-trie regex (keyword_trie), matched with a lookahead at every word
+start, so tag() is a single pass over the text however many keywords or
+cities there are.
+
+Matches are whole words. "bar" doesn't match "Barbican" and "pub" doesn't
+match "gastropub", though a plural "s" is allowed ("bars", "cocktails"). A
+keyword found inside a longer one ("bar" in "wine bar", "Richmond" in "Inner
+Richmond") counts as found too. For neighbourhood and cuisine, though, the
+longer, more specific keyword wins.
+"""
+
+import re
+
+from keyword_trie import trie_pattern
+
+_WORD_RE = re.compile(r"\w+(?:['-]\w+)*")
+# Numeric scores, one pass: "4.8/5", "4.5 stars" / "4.5★", "9.2/10". The first
+# score of each kind counts; kinds are tried in this order.
+_SCORE_RE = re.compile(r'(\d+\.?\d*)\s*(?:/\s*(?P<out_of_5>5)\b|(?P<stars>[Ss][Tt][Aa][Rr]|★)|/\s*(?P<out_of_10>10)\b)')
+_SCORE_KINDS = [("out_of_5", 4.0, "{}/5"), ("stars", 4.0, "★ {}"), ("out_of_10", 8.0, "{}/10")]
+
+
+class VenueTagger:
+    """Keyword automaton for one city; tag() returns neighbourhood, cuisine, type and rating."""
+
+    def __init__(self, neighbourhoods: list[str], cuisines: dict[str, str],
+                 type_signals: dict[str, list[str]], ratings: list[tuple[str, list[str]]]):
+        self.neighbourhoods: dict[str, tuple[int, str]] = {}   # keyword → (priority, value)
+        for i, n in enumerate(neighbourhoods):
+            self.neighbourhoods.setdefault(n.lower(), (i, n))
+        self.cuisines: dict[str, tuple[int, str]] = {}
+        for i, (keyword, label) in enumerate(cuisines.items()):
+            self.cuisines.setdefault(keyword.lower(), (i, label))
+        self.types = list(type_signals)
+        self.type_signals = {}
+        for vtype, signals in type_signals.items():
+            for s in signals:
+                self.type_signals.setdefault(s.lower(), set()).add(vtype)
+        self.ratings = [(label, {p.lower() for p in phrases}) for label, phrases in ratings]
+
+        keywords = set(self.neighbourhoods) | set(self.cuisines) | set(self.type_signals)
+        for _, phrases in self.ratings:
+            keywords |= phrases
+        self.pattern = re.compile(r"\b(?=(%s)s?\b)" % trie_pattern(keywords))
+        self.contains = {k: _sub_keywords(k, keywords) for k in keywords if " " in k or "-" in k or "'" in k}
+
+    def keywords_in(self, text: str) -> set[str]:
+        """Every keyword present in text as whole words (including ones inside longer matches)."""
+        found = set()
+        for m in self.pattern.finditer(text.lower().replace("’", "'")):
+            keyword = m.group(1)
+            found.add(keyword)
+            found |= self.contains.get(keyword, set())
+        return found
+
+    def tag(self, text: str, is_work: bool = False) -> dict:
+        found = self.keywords_in(text)
+        return {
+            "neighbourhood": self._most_specific(found, self.neighbourhoods),
+            "cuisine": self._most_specific(found, self.cuisines),
+            "type": "cafe" if is_work else self._venue_type(found),
+            "rating": self._rating(found, text),
+        }
+
+    def _most_specific(self, found: set[str], table: dict) -> str:
+        """Value of the first-listed found keyword that isn't part of another found one."""
+        hits = [k for k in found if k in table]
+        inner = set().union(*(self.contains.get(k, set()) for k in hits))
+        best = min((table[k] for k in hits if k not in inner), default=None)
+        return best[1] if best else ""
+
+    def _venue_type(self, found: set[str]) -> str:
+        scores = {vtype: 0 for vtype in self.types}
+        for k in found:
+            for vtype in self.type_signals.get(k, ()):
+                scores[vtype] += 1
+        best = max(scores, key=lambda t: scores[t])
+        return best if scores[best] > 0 else "restaurant"
+
+    def _rating(self, found: set[str], text: str) -> str:
+        for label, phrases in self.ratings:
+            if found & phrases:
+                return label
+        first = {}
+        for m in _SCORE_RE.finditer(text):
+            first.setdefault(m.lastgroup, m.group(1))
+        for kind, minimum, fmt in _SCORE_KINDS:
+            if kind in first and float(first[kind]) >= minimum:
+                return fmt.format(first[kind])
+        return ""
+
+
+def _sub_keywords(keyword: str, keywords: set[str]) -> set[str]:
+    """Keywords made of a contiguous run of keyword's words, e.g. "wine bar" → {"wine", "bar"} ∩ keywords."""
+    spans = [m.span() for m in _WORD_RE.finditer(keyword)]
+    subs = set()
+    for i in range(len(spans)):
+        for j in range(i, len(spans)):
+            part = keyword[spans[i][0]:spans[j][1]]
+            if part != keyword and part in keywords:
+                subs.add(part)
+    return subs